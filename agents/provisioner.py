@@ -2,17 +2,31 @@
 
 import sys
 import os
+import re
 import time
+import json
+import shlex
 import shutil
+import signal
+import asyncio
+import threading
+import subprocess
+import platform
 import importlib
 import inspect
-from typing import Dict, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from types import MappingProxyType
+from urllib.parse import quote
+from typing import Dict, Any, List, Optional, Tuple
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.logging_config import get_logger
 from core.llm import OpenAIClientManager
 from reactor.models import ReActState, ScratchpadEntry, ParsedLLMResponse
 from core.models import UFDescriptor
+from tools.file_system import user_confirm, UserConfirmInput, user_prompt, UserPromptInput
 # Terminal colors for output formatting
 class Colors:
     """ANSI color codes for terminal output."""
@@ -27,20 +41,664 @@ class Colors:
     CYAN = '\033[36m'
     WHITE = '\033[37m'
 
+class ObservationStatus(str, Enum):
+    """Outcome of a provisioner action, taken from the observation prefix."""
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    ERROR = "ERROR"
+    NOT_FOUND = "NOT_FOUND"
+    LOOP_DETECTED = "LOOP_DETECTED"
+    OTHER = "OTHER"
+
+_OBSERVATION_STATUSES = {status.value: status for status in ObservationStatus}
+
+# Live-update color for each observation status
+_OBSERVATION_COLORS = {
+    ObservationStatus.SUCCESS: Colors.GREEN,
+    ObservationStatus.FAILED: Colors.RED,
+    ObservationStatus.ERROR: Colors.RED,
+    ObservationStatus.LOOP_DETECTED: Colors.YELLOW
+}
+
+def _observation_status(observation: str) -> ObservationStatus:
+    """Classify an observation by its prefix (the text before the first ':')."""
+    return _OBSERVATION_STATUSES.get(observation.partition(":")[0], ObservationStatus.OTHER)
+
+def _observation_failed(observation: str) -> bool:
+    """Whether an observation mentions an error or failure anywhere (e.g. in a command's stderr)."""
+    return "ERROR" in observation or "FAILED" in observation
+
 logger = get_logger('agents.provisioner')
 
+# Static provisioning instructions. Sent as the system message so the prefix stays
+# byte-identical across turns and can be served from the provider's prompt cache.
+PROVISIONER_SYSTEM_PROMPT = """You are a specialized Tool Provisioning Agent. Your ONLY job is to find and install the requested tool.
+
+AVAILABLE ACTIONS:
+1. execute_shell - Run shell commands to install tools
+2. check_command_exists - Verify if a tool is already installed (accepts a list of candidate names)
+3. user_confirm - Ask user for permission before risky operations (auto-approved in auto mode)
+4. user_prompt - Ask user for guidance when stuck or need information
+5. ask_llm_for_instructions - Get installation instructions from LLM for a specific tool and platform
+6. web_search_for_tool - Search web for tool installation troubleshooting or alternatives
+7. probe_install_candidates - Run several read-only probe commands in parallel and report which succeed
+8. probe_package_managers - Detect which package managers are installed (and their versions) in one parallel check
+9. finish - Complete the task with structured results
+
+RESPONSE FORMAT (MANDATORY):
+Thought: [Your reasoning]
+Intent: provision_tool
+Action: {"tool_name": "action_name", "parameters": {"param": "value"}}
+
+RULES:
+1. Always include Thought, Intent, and Action lines
+2. Intent must always be "provision_tool" for this agent
+3. Action must be valid JSON with double quotes only
+4. No single quotes, no trailing commas, no extra text after JSON
+5. Parameters must be a JSON object, even if empty
+
+EXAMPLES:
+Thought: Checking if tool exists
+Intent: provision_tool
+Action: {"tool_name": "check_command_exists", "parameters": {"command_name": "rg"}}
+
+Thought: The tool may be installed under one of several names
+Intent: provision_tool
+Action: {"tool_name": "check_command_exists", "parameters": {"command_names": ["xsv", "rust-xsv", "qsv"]}}
+
+Thought: Need permission to install system packages
+Intent: provision_tool
+Action: {"tool_name": "user_confirm", "parameters": {"message": "Install ripgrep via homebrew (requires system changes)?", "default_yes": true}}
+
+Thought: Installing the tool
+Intent: provision_tool
+Action: {"tool_name": "execute_shell", "parameters": {"command": "brew install ripgrep"}}
+
+Thought: Need to understand what type of tool this is and correct installation method
+Intent: provision_tool
+Action: {"tool_name": "ask_llm_for_instructions", "parameters": {"tool_name": "scrubcsv", "platform": "macOS"}}
+
+Thought: LLM instructions failed, searching web for installation alternatives
+Intent: provision_tool
+Action: {"tool_name": "web_search_for_tool", "parameters": {"tool_name": "reconcile-csv", "query": "reconcile-csv installation rust crates"}}
+
+Thought: Check which package managers know this tool before trying installs one by one
+Intent: provision_tool
+Action: {"tool_name": "probe_install_candidates", "parameters": {"commands": ["brew info ripgrep", "cargo search ripgrep --limit 1", "apt-cache show ripgrep"]}}
+
+Thought: Find out which package managers this machine has before choosing an install method
+Intent: provision_tool
+Action: {"tool_name": "probe_package_managers", "parameters": {}}
+
+Thought: Multiple installation methods failed, need user guidance
+Intent: provision_tool
+Action: {"tool_name": "user_prompt", "parameters": {"question": "Failed to install via pip, brew, and apt. Do you have a preferred package manager or should I try building from source?"}}
+
+
+Thought: Task completed successfully
+Intent: provision_tool
+Action: {"tool_name": "finish", "parameters": {"success": true, "tool_name": "ripgrep", "message": "Installed via brew"}}
+
+INSTALLATION STRATEGIES (try in order):
+1. First check if tool already exists with check_command_exists
+2. **ASK PERMISSION** before system changes with user_confirm (automatically approved in auto mode)
+3. Package managers (prioritize by OS): macOS=brew, Linux=apt/yum, Windows=chocolatey
+4. **CLI applications**: pipx install (preferred for Python CLI tools like radon, black, flake8)
+5. Language-specific managers: Python=pip/pip3 (only for project dependencies in venv), Node=npm/yarn, Rust=cargo
+6. Alternative package names: try common variations (xsv vs rust-xsv)
+7. **IF STANDARD METHODS FAIL**: Use ask_llm_for_instructions to get tool-specific installation knowledge
+8. **IF LLM INSTRUCTIONS FAIL**: Use web_search_for_tool to find troubleshooting info and alternatives
+9. **ASK FOR GUIDANCE** if still stuck with user_prompt
+10. Direct downloads or source compilation as last resort
+11. Finish with failure and suggest alternatives if all methods fail
+
+IMPORTANT RULES:
+- ALWAYS start by checking if tool already exists with check_command_exists
+- **CHOOSE INSTALLATION METHOD WISELY**:
+  • CLI tools (radon, black, flake8, pylint, etc.) → Use pipx install
+  • Project dependencies (libraries) → Use pip install in venv
+  • System tools → Use brew/apt/package manager
+- **ENVIRONMENT RULES**:
+  • Virtual environment is automatically created at agent startup
+  • Use pip install (in venv) for project dependencies only
+  • Never use --user --break-system-packages (venv handles isolation)
+- **LLM KNOWLEDGE GATHERING & WEB SEARCH**:
+  • Use ask_llm_for_instructions when standard package managers fail
+  • If LLM instructions fail or return no results, use web_search_for_tool for troubleshooting
+  • Web search can identify common issues (wrong tool type, package not published, etc.)
+  • Extract tool name from goal and current platform info for queries
+- **USER INTERACTION RULES**:
+  • Use user_confirm BEFORE installing packages (system changes need permission)
+  • Use ask_llm_for_instructions BEFORE user_prompt when installations fail
+  • Use user_prompt AFTER LLM instructions fail (ask for guidance/preferences)
+  • Use user_prompt when multiple approaches exist (let user choose)
+  • Use user_prompt for missing info (API tokens, custom repos, etc.)
+- Some packages provide multiple commands (e.g., csvkit provides csvcut, csvstat, csvlook, csvgrep)
+- The check_command_exists tool is smart - use the package name and it will check for all relevant commands
+- Detect OS to prioritize correct package managers (macOS=brew, Linux=apt/yum)
+- Try package variations if base name fails (e.g., 'xsv' then 'rust-xsv')
+- Check name variations together: pass up to 10 candidates in one check_command_exists call via command_names
+- Use probe_install_candidates to check several package managers at once; probes must be simple read-only commands (no pipes, no installs)
+- Use probe_package_managers once instead of separate check_command_exists calls for brew, apt, pip, npm, cargo, etc.
+- For Python tools: try 'pip install' then 'pip3 install' then 'pip install --user'
+- Verify installation by re-checking command exists after install attempt using the PACKAGE NAME
+- Finish early with success when tool is found/installed successfully
+- After 2-3 different installation attempts fail, use ask_llm_for_instructions to get tool-specific knowledge
+- If LLM instructions also fail, then ask user for guidance before giving up
+
+LOOP PREVENTION - CRITICAL:
+- NEVER repeat the exact same command that failed before
+- Learn from PREVIOUS ATTEMPTS: if 'pip install xsv' failed, try 'brew install xsv' not 'pip install xsv' again
+- Try systematic variations: different package managers, different package names, different flags
+- Package name variations: tool → py-tool → python-tool → tool-cli → rust-tool
+- If 2+ attempts with same package manager failed, switch to different manager
+- If installation fails but should succeed, check if command now exists anyway
+
+COMMON TOOL INSTALLATION PATTERNS:
+- Rust tools (scrubcsv, ripgrep, fd, exa, bat): brew install rust && cargo install <tool>
+- Go tools: go install github.com/author/<tool>@latest
+- Node tools: npm install -g <tool>
+- Python tools with system deps: brew install <deps> && pip install <tool>
+- Tools with custom installers: curl <url> | sh
+- Language-specific package managers often work better than system ones
+
+FINISH ACTION STRUCTURE:
+Success: {"tool_name": "finish", "parameters": {"success": true, "tool_name": "<name>", "installation_method": "<method>", "message": "<details>", "tool_path": "<path>", "verification_command": "<cmd>"}}
+
+Failure: {"tool_name": "finish", "parameters": {"success": false, "tool_name": "<name>", "message": "<error_details>", "error_type": "<type>", "attempted_methods": ["<method1>", "<method2>"], "suggested_alternatives": ["<alt1>", "<alt2>"], "fallback_commands": ["<cmd1>", "<cmd2>"]}}"""
+
+# Characters of each past observation shown in the prompt history
+HISTORY_OBSERVATION_LIMIT = 500
+# Once rendered history exceeds this many characters, all but the most recent turns are summarized
+HISTORY_CHAR_BUDGET = 6000
+HISTORY_RECENT_TURNS = 3
+
+# Closing section of every per-turn prompt
+PROMPT_TURN_TAIL = """
+
+CURRENT TURN {turn}:
+What should you do next to install the requested tool?
+
+Your response:"""
+
+# Precompiled patterns for response and goal parsing
+REFUSAL_PATTERNS = (
+    "i'm sorry, but i can't assist",
+    "i cannot assist",
+    "i'm unable to help",
+    "i can't help with that",
+    "i cannot help with that",
+    "that's not something i can help with"
+)
+_REFUSAL_RE = re.compile("|".join(re.escape(p) for p in REFUSAL_PATTERNS), re.IGNORECASE)
+# Pattern: "I need <tool> to do <purpose>" or "I need any tool to do <purpose>"
+_GOAL_RE = re.compile(r"I need (?P<tool>[\w\-]+|any tool) to (?:do )?(?P<purpose>.*)", re.IGNORECASE)
+
+# Common package managers, for loop detection
+PACKAGE_MANAGERS = ("pip", "pip3", "brew", "apt", "apt-get", "yum", "npm", "yarn")
+_PACKAGE_MANAGER_RE = re.compile(r'^(pip|pip3|brew|apt|apt-get|yum|npm|yarn)\b')
+# One pass finds every '<pm> install <package>'; longer names first so 'pip3'/'apt-get' aren't cut short
+_PACKAGE_INSTALL_RE = re.compile(
+    r"(" + "|".join(sorted(PACKAGE_MANAGERS, key=len, reverse=True)) + r")\s+install\s+([^\s]+)"
+)
+
+# Lowercases ASCII letters and deletes '-'/'_' in a single str.translate pass
+_NAME_FOLD_TABLE = str.maketrans({**{c: None for c in "-_"}, **{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)}})
+
+def _fold_name(name: str) -> str:
+    """Case- and separator-insensitive form of a package or tool name."""
+    folded = name.translate(_NAME_FOLD_TABLE)
+    # The table only covers ASCII; fall back to full Unicode lowercasing otherwise
+    return folded if folded.isascii() else folded.lower()
+
+def _clean_package_name(name: str) -> str:
+    """Package name with case, separators and python/py affixes removed, for similarity checks."""
+    return _fold_name(name).replace("python", "").replace("py", "")
+
+def _cleaned_names_similar(clean1: str, clean2: str) -> bool:
+    """Check if two cleaned package names are very similar."""
+    # Must be close in length; checked first since it rules out most pairs without a substring search
+    if abs(len(clean1) - len(clean2)) > 2:
+        return False
+
+    # If one is substring of another
+    return clean1 in clean2 or clean2 in clean1
+
+def _has_complete_action(text: str) -> bool:
+    """True once the last 'Action:' in a streamed response has a balanced JSON object followed by a newline."""
+    action_pos = text.rfind("Action:")
+    if action_pos == -1:
+        return False
+    start = text.find("{", action_pos)
+    if start == -1:
+        return False
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return "\n" in text[pos + 1:]
+    return False
+
+def _shell_command(action: Dict[str, Any]) -> Optional[str]:
+    """Command string of an execute_shell action, or None for any other action."""
+    if action.get("tool_name") != "execute_shell":
+        return None
+    params = action.get("parameters")
+    return params.get("command", "") if params else ""
+
+def _install_targets(command: str) -> List[Tuple[str, str]]:
+    """(package manager, package) pairs for each '<pm> install <package>' found in a command."""
+    targets = {}
+    for match in _PACKAGE_INSTALL_RE.finditer(command):
+        # Keep the first install per package manager
+        targets.setdefault(match.group(1), match.group(2).strip())
+    return list(targets.items())
+
+def _command_installs(command: str, names: List[str]) -> bool:
+    """True if a command runs an 'install' whose package arguments match one of the given tool names."""
+    wanted = [clean for clean in (_clean_package_name(name) for name in names if name) if clean]
+    words = command.split()
+    for pos, word in enumerate(words):
+        if word != "install":
+            continue
+        for arg in words[pos + 1:]:
+            if arg in ("&&", "||", ";", "|"):
+                break
+            if arg.startswith("-"):
+                continue
+            # Drop version pins and extras: 'csvkit==1.0', 'black[d]', 'pkg@latest'
+            package = _clean_package_name(re.split(r"[<>=@\[]", arg, maxsplit=1)[0])
+            if package and any(_cleaned_names_similar(package, clean) for clean in wanted):
+                return True
+    return False
+
+# Case-insensitive failure classification of observations
+_FAILURE_KEYWORD_RE = re.compile(r"ERROR|FAILED|NOT FOUND|PERMISSION DENIED|LOOP_DETECTED", re.IGNORECASE)
+_ERROR_KEYWORD_RE = re.compile(r"ERROR", re.IGNORECASE)
+# Shell commands that look like an installation attempt
+_INSTALL_KEYWORD_RE = re.compile(r"install|brew|pip|apt|yum|npm")
+# Failure categories in priority order: when several match, the earliest listed wins
+_FAILURE_CATEGORIES = (
+    ("permission_issues", r"PERMISSION DENIED"),
+    ("missing_package_manager", r"NOT FOUND"),
+    ("wrong_package_name", r"NO SUCH FILE"),
+    ("network_issues", r"NETWORK|TIMEOUT"),
+)
+FAILURE_CATEGORY_COUNT = len(_FAILURE_CATEGORIES) + 1  # Plus "pip_failed"
+_FAILURE_CATEGORY_PRIORITY = {label: rank for rank, (label, _) in enumerate(_FAILURE_CATEGORIES)}
+# One alternation with a named group per category, so each observation is scanned once
+_FAILURE_CATEGORY_RE = re.compile(
+    "|".join(f"(?P<{label}>{pattern})" for label, pattern in _FAILURE_CATEGORIES),
+    re.IGNORECASE
+)
+
+# Known problematic tools reported by web_search_for_tool
+KNOWN_TOOL_ISSUES = MappingProxyType({
+    "reconcile-csv": {
+        "issue": "Tool is Java-based, not available via Cargo",
+        "alternatives": [
+            "Use qsv (Rust CSV toolkit): cargo install qsv",
+            "Use csv-diff (Rust CSV comparison): cargo install csv-diff",
+            "Download original Java version from GitHub"
+        ],
+        "original_location": "https://github.com/rufuspollock-okfn/reconcile-csv"
+    },
+    "scrubcsv": {
+        "issue": "Tool may not be published to crates.io",
+        "alternatives": [
+            "Use csvkit (Rust): cargo install csvkit",
+            "Use qsv for CSV processing: cargo install qsv",
+            "Build from source if GitHub repo exists"
+        ]
+    }
+})
+
+def _normalize_tool_name(name: str) -> str:
+    """Lowercase a tool name and drop separators so 'Reconcile_CSV' matches 'reconcile-csv'."""
+    return _fold_name(name)
+
+def _format_known_issue(info: Dict[str, Any]) -> str:
+    """Render a KNOWN_TOOL_ISSUES entry as web search advice."""
+    result = f"Found common issue: {info['issue']}. "
+    result += f"Alternatives: {'; '.join(info['alternatives'])}"
+    if 'original_location' in info:
+        result += f". Original tool: {info['original_location']}"
+    return result
+
+# Formatted once at import; aliases give exact matches a dict lookup before the substring scan
+_KNOWN_TOOL_ADVICE = MappingProxyType({name: _format_known_issue(info) for name, info in KNOWN_TOOL_ISSUES.items()})
+_KNOWN_TOOL_ALIASES = {_normalize_tool_name(name): name for name in KNOWN_TOOL_ISSUES}
+
+# Tool names that failed to import as Python modules; cleared after successful shell commands
+_failed_module_imports: set = set()
+
+# @uf descriptors found per (module name, file, mtime)
+_uf_scan_cache: Dict[Tuple[str, str, float], List[UFDescriptor]] = {}
+
+# Web search: pooled HTTP session and short-lived result cache keyed by query
+WEB_SEARCH_CACHE_TTL_SECONDS = 3600
+WEB_SEARCH_CACHE_SIZE = 256
+WEB_SEARCH_MAX_RESPONSE_BYTES = 256 * 1024
+_web_session = None
+_web_search_cache: Dict[str, Tuple[float, str]] = {}
+_web_search_inflight: Dict[str, Future] = {}
+_web_search_lock = threading.Lock()
+
+def _get_web_session():
+    """Return a shared requests session with keep-alive pooling, created on first use."""
+    global _web_session
+    if _web_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _web_session = requests.Session()
+        _web_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return _web_session
+
+# Fallback suggestions when provisioning fails, bucketed by goal keywords (substring, case-insensitive)
+_ALTERNATIVE_BUCKETS = (
+    (re.compile(r"linting|lint|ruff|flake8|pylint", re.IGNORECASE), (
+        "Use Python's built-in ast module for syntax checking",
+        "Implement custom linting with grep patterns for common issues",
+        "Use your IDE's built-in linting features"
+    )),
+    (re.compile(r"formatting|format|black|autopep8", re.IGNORECASE), (
+        "Use manual formatting following PEP 8 guidelines",
+        "Use simple string manipulation for basic formatting",
+        "Apply formatting rules with sed/awk commands"
+    )),
+    (re.compile(r"testing|test|pytest|unittest", re.IGNORECASE), (
+        "Use Python's built-in unittest module",
+        "Write custom test scripts with assert statements",
+        "Create simple validation scripts"
+    )),
+    (re.compile(r"package|dependency|install", re.IGNORECASE), (
+        "Download and install manually from source",
+        "Use alternative package managers",
+        "Find equivalent tools already available"
+    )),
+)
+_DEFAULT_ALTERNATIVES = (
+    "Use built-in system tools for similar functionality",
+    "Implement custom scripts to achieve the same goal",
+    "Search for alternative tools with similar features"
+)
+
+# Number of most recent turns considered by failure pattern analysis
+FAILURE_ANALYSIS_WINDOW = 8
+
+# Shell execution limits
+SHELL_TIMEOUT_SECONDS = 120  # 2 minute timeout for installations
+SHELL_OUTPUT_LIMIT = 1000  # Characters of stdout/stderr kept in observations
+SHELL_READ_CHUNK_BYTES = 4096  # Bounded read size when draining subprocess pipes
+
+# Candidate names per batched check_command_exists call
+MAX_CHECK_COMMANDS = 10
+
+# Characters that need a real shell (pipes, redirects, expansion, globbing, chaining)
+SHELL_METACHARACTERS = frozenset("|&;<>$`()\\*?[]{}~#\n")
+
+# Commands that prompt for a password on the controlling terminal, so must keep it
+PRIVILEGE_COMMANDS = frozenset({"sudo", "doas", "su"})
+
+# Limits for parallel probe commands
+MAX_CONCURRENT_PROBES = 4
+MAX_PROBE_CANDIDATES = 10
+PROBE_TIMEOUT_SECONDS = 120
+
+# Probes must be read-only; argv words that change the system (or hand off to a shell) are refused
+PROBE_MUTATING_WORDS = frozenset({
+    "install", "reinstall", "add", "upgrade", "update", "remove", "uninstall", "purge", "autoremove",
+    "delete", "rm", "mv", "cp", "dd", "ln", "chmod", "chown", "mkdir", "rmdir", "touch", "tee",
+    "link", "unlink", "tap", "untap", "sudo", "doas", "su", "sh", "bash", "zsh", "dash", "fish",
+    "env", "xargs", "eval", "exec", "kill", "pkill", "shutdown", "reboot"
+})
+
+# Package managers checked by probe_package_managers when none are given
+KNOWN_PACKAGE_MANAGERS = ("brew", "apt-get", "yum", "dnf", "pip3", "pipx", "npm", "cargo", "choco")
+MANAGER_PROBE_TIMEOUT_SECONDS = 5
+
+# Persistent provisioning caches shared across runs
+# Host platform name as used in installation queries; detected once since it can't change mid-process
+_SYSTEM = platform.system().lower()
+HOST_PLATFORM = {"darwin": "macOS", "linux": "Linux", "windows": "Windows"}.get(_SYSTEM, _SYSTEM)
+
+OATS_HOME = Path.home() / ".oats"
+INSTRUCTIONS_CACHE_FILE = OATS_HOME / "llm_instructions.json"
+INSTALL_MEMO_FILE = OATS_HOME / "install_memo.json"
+
+INSTRUCTIONS_CACHE_TTL_SECONDS = 30 * 24 * 3600  # Package names and managers do drift, slowly
+INSTALL_MEMO_TTL_SECONDS = 14 * 24 * 3600  # Remembered commands are replayed unattended, so re-plan more often
+
+# Well-known install commands, answered without an LLM call even on a first run
+KNOWN_INSTALL_INSTRUCTIONS = MappingProxyType({
+    "ripgrep|macOS": "brew install ripgrep",
+    "ripgrep|Linux": "sudo apt-get install -y ripgrep",
+    "jq|macOS": "brew install jq",
+    "jq|Linux": "sudo apt-get install -y jq",
+    "csvkit|macOS": "pipx install csvkit",
+    "csvkit|Linux": "pipx install csvkit",
+    "imagemagick|macOS": "brew install imagemagick",
+    "imagemagick|Linux": "sudo apt-get install -y imagemagick",
+})
+
+_instructions_cache: Optional[Dict[str, Dict[str, Any]]] = None
+_install_memo: Optional[Dict[str, Dict[str, str]]] = None
+
+def _load_json_cache(path: Path) -> Dict[str, Any]:
+    """Load a JSON cache file, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_json_cache(path: Path, data: Dict[str, Any]) -> None:
+    """Atomically write a JSON cache file; failures are logged, never raised."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write cache {path}: {e}")
+
+def _get_instructions_cache() -> Dict[str, Dict[str, Any]]:
+    """Return the (tool, platform) -> install commands cache, loading it from disk once."""
+    global _instructions_cache
+    if _instructions_cache is None:
+        _instructions_cache = _load_json_cache(INSTRUCTIONS_CACHE_FILE)
+    return _instructions_cache
+
+def _lookup_install_instructions(cache_key: str) -> Optional[str]:
+    """Cached or well-known install commands for a 'tool|platform' key, ignoring expired entries."""
+    entry = _get_instructions_cache().get(cache_key)
+    # Entries written before expiry tracking are plain strings; let them be refreshed
+    if isinstance(entry, dict) and time.time() - entry.get("cached_at", 0) < INSTRUCTIONS_CACHE_TTL_SECONDS:
+        return entry.get("commands")
+    return KNOWN_INSTALL_INSTRUCTIONS.get(cache_key)
+
+def _store_install_instructions(cache_key: str, commands: str) -> None:
+    """Persist install commands for a 'tool|platform' key with the current time."""
+    instructions_cache = _get_instructions_cache()
+    instructions_cache[cache_key] = {"commands": commands, "cached_at": time.time()}
+    _save_json_cache(INSTRUCTIONS_CACHE_FILE, instructions_cache)
+
+def _get_install_memo() -> Dict[str, Dict[str, str]]:
+    """Return the (tool, OS) -> winning install command memo, loading it from disk once."""
+    global _install_memo
+    if _install_memo is None:
+        _install_memo = _load_json_cache(INSTALL_MEMO_FILE)
+    return _install_memo
+
+def _simple_argv(command: str) -> Optional[List[str]]:
+    """Split a command into argv if it can run without a shell, else None."""
+    if any(c in SHELL_METACHARACTERS for c in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    # Leading VAR=value assignments are shell syntax
+    if not argv or "=" in argv[0]:
+        return None
+    return argv
+
+def _string_list(value: Any) -> List[str]:
+    """Normalize an LLM-supplied string or list parameter to a list of non-empty strings."""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+
+def _mutating_probe_words(argv: List[str]) -> List[str]:
+    """Words in a probe's argv that would make it more than a read-only query."""
+    words = []
+    for arg in argv:
+        word = os.path.basename(arg).lower().lstrip("-")
+        if word in PROBE_MUTATING_WORDS:
+            words.append(word)
+    return words
+
+def _run_coroutine(coro):
+    """asyncio.run that also works when the caller is already inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # asyncio.run refuses to nest, so give the coroutine its own loop on a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def _needs_terminal(command: str) -> bool:
+    """True if a command escalates privileges, which prompts on (and caches credentials per) the controlling tty."""
+    return any(os.path.basename(word) in PRIVILEGE_COMMANDS for word in command.split())
+
+def _spawn_command(command: str) -> subprocess.Popen:
+    """Start a command with piped output, skipping the intermediate shell for simple argv commands."""
+    # A new session makes the command a process group leader so a timeout can kill its children
+    # too, but it also detaches it from the terminal sudo needs for its password prompt
+    new_session = not _needs_terminal(command)
+    argv = _simple_argv(command)
+    if argv is not None:
+        try:
+            return subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=new_session)
+        except OSError:
+            pass  # Builtins and missing commands: let the shell produce its usual error
+    return subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=new_session)
+
+def _kill_process_tree(process: subprocess.Popen) -> None:
+    """Kill a process started by _spawn_command, along with anything it spawned if it leads its own group."""
+    if hasattr(os, "killpg"):
+        try:
+            # Commands left in our session share our process group; killing that would kill us
+            if os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+        except OSError:
+            pass
+    process.kill()
+
+def _run_with_bounded_output(command: str, timeout: float, limit: int) -> Tuple[int, str, str]:
+    """
+    Run a shell command, keeping only the first `limit` characters of stdout and stderr.
+
+    Output is drained in fixed-size chunks so verbose installers (including
+    progress bars that never emit a newline) never buffer in full; anything
+    past the limit is read and discarded.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command runs longer than `timeout` seconds
+    """
+    byte_limit = limit * 4  # Upper bound on UTF-8 bytes for `limit` characters
+    stdout_buf = bytearray()
+    stderr_buf = bytearray()
+
+    def drain(stream, buf: bytearray):
+        for chunk in iter(lambda: stream.read1(SHELL_READ_CHUNK_BYTES), b''):
+            if len(buf) < byte_limit:
+                buf += chunk[:byte_limit - len(buf)]
+        stream.close()
+
+    process = _spawn_command(command)
+    readers = [
+        threading.Thread(target=drain, args=(process.stdout, stdout_buf), daemon=True),
+        threading.Thread(target=drain, args=(process.stderr, stderr_buf), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        return_code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_tree(process)
+        process.wait()
+        for reader in readers:
+            reader.join(timeout=1)
+        raise
+
+    for reader in readers:
+        reader.join()
+
+    def decode(buf: bytearray) -> str:
+        text = buf.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+        return text[:limit]
+
+    return return_code, decode(stdout_buf), decode(stderr_buf)
+
 class ToolProvisioningAgent:
     """
     Specialized agent for finding and installing tools.
     Operates its own ReAct loop focused solely on tool provisioning.
     """
 
+    _response_parser = None  # Shared AgentController, used only for its ReAct response parser
+
+    # PATH index for command lookups, shared by all agents in the process; rebuilt lazily
+    # after successful shell commands or when the executable search path changes
+    _path_index: Optional[Dict[str, str]] = None
+    _path_index_key: Optional[tuple] = None
+    _path_index_dirty = False
+    _commands_not_found: set = set()
+
     def __init__(self, registry=None, auto_mode=False):
         self.registry = registry  # Reference to main registry for dynamic updates
         self.llm_client = OpenAIClientManager()
         self.auto_mode = auto_mode  # Skip user confirmations when True
+        # Rendered prompt history blocks, one per scratchpad entry of the current run
+        self._history_state: Optional[ReActState] = None
+        self._history_blocks: List[str] = []
+        self._history_summaries: List[str] = []
+        self._history_chars = 0
+        # Last rendered prompt and the (scratchpad length, turn, goal) it was built for
+        self._last_prompt_key: Optional[Tuple[int, int, str]] = None
+        self._last_prompt = ""
+        # Live-update output queued between flush points (see _emit)
+        self._live_buffer: List[str] = []
+        # Shell commands and checks seen so far in the current run, for loop detection
+        self._action_index_state: Optional[ReActState] = None
+        self._action_index: Dict[str, Any] = {}
         # Limited toolset for provisioning - avoid circular dependencies
-        self.available_tools = ["execute_shell", "check_command_exists", "user_confirm", "user_prompt", "ask_llm_for_instructions", "web_search_for_tool", "finish"]
+        self.available_tools = ["execute_shell", "check_command_exists", "user_confirm", "user_prompt", "ask_llm_for_instructions", "web_search_for_tool", "probe_install_candidates", "probe_package_managers", "finish"]
 
     def run(self, goal: str, show_live_updates: bool = True, auto_mode: bool = None) -> dict:
         """
@@ -60,10 +718,18 @@ class ToolProvisioningAgent:
             self.auto_mode = auto_mode
 
         if show_live_updates:
-            print(f"\n{Colors.BOLD}{Colors.BLUE}═══ TOOL PROVISIONING AGENT ═══{Colors.RESET}")
-            print(f"{Colors.BOLD}Goal:{Colors.RESET} {goal}")
+            self._emit(f"\n{Colors.BOLD}{Colors.BLUE}═══ TOOL PROVISIONING AGENT ═══{Colors.RESET}")
+            self._emit(f"{Colors.BOLD}Goal:{Colors.RESET} {goal}")
             auto_status = " (AUTO MODE)" if self.auto_mode else ""
-            print(f"{Colors.YELLOW}🔧 Starting tool provisioning with live updates...{auto_status}{Colors.RESET}")
+            self._emit(f"{Colors.YELLOW}🔧 Starting tool provisioning with live updates...{auto_status}{Colors.RESET}")
+            self._flush_live_updates()
+
+        # Known tools skip the LLM loop entirely
+        memo_result = self._try_install_memo(goal, show_live_updates)
+        self._flush_live_updates()
+        if memo_result:
+            memo_result["execution_time"] = time.time() - start_time
+            return memo_result
 
         # Initialize state with turn limit - allow up to 10 turns before requiring approval
         state = ReActState(goal=goal, max_turns=10)
@@ -78,11 +744,12 @@ class ToolProvisioningAgent:
                 if turn_num > state.max_turns:
                     if self.auto_mode:
                         if show_live_updates:
-                            print(f"\n{Colors.YELLOW}⚠️  Reached maximum turns ({state.max_turns}). Auto mode: continuing...{Colors.RESET}")
+                            self._emit(f"\n{Colors.YELLOW}⚠️  Reached maximum turns ({state.max_turns}). Auto mode: continuing...{Colors.RESET}")
                         logger.info("Auto mode: continuing past max turns")
                     else:
                         if show_live_updates:
-                            print(f"\n{Colors.YELLOW}⚠️  Reached maximum turns ({state.max_turns}). Continue? (Y/n, Enter=Y): {Colors.RESET}", end="")
+                            self._emit(f"\n{Colors.YELLOW}⚠️  Reached maximum turns ({state.max_turns}). Continue? (Y/n, Enter=Y): {Colors.RESET}", end="")
+                            self._flush_live_updates()
                             response = input().strip().lower()
                             if response in ['n', 'no']:
                                 logger.info("Tool provisioning stopped by user after max turns")
@@ -93,37 +760,42 @@ class ToolProvisioningAgent:
 
                 if show_live_updates:
                     turn_display = f"{turn_num}/{state.max_turns}+" if turn_num > state.max_turns else f"{turn_num}/{state.max_turns}"
-                    print(f"\n{Colors.BOLD}{Colors.CYAN}┌─ Turn {turn_display} ─────────────────────────────────────────────────┐{Colors.RESET}")
-                    print(f"{Colors.BOLD}│ Reasoning...                                              │{Colors.RESET}")
-                    print(f"{Colors.BOLD}└───────────────────────────────────────────────────────────┘{Colors.RESET}")
+                    self._emit(f"\n{Colors.BOLD}{Colors.CYAN}┌─ Turn {turn_display} ─────────────────────────────────────────────────┐{Colors.RESET}")
+                    self._emit(f"{Colors.BOLD}│ Reasoning...                                              │{Colors.RESET}")
+                    self._emit(f"{Colors.BOLD}└───────────────────────────────────────────────────────────┘{Colors.RESET}")
+
+                    # Show the turn header before waiting on the model
+                    self._flush_live_updates()
 
                 # Build specialized prompt for tool provisioning
-                prompt = self._build_provisioner_prompt(state, goal)
+                messages = self._build_provisioner_messages(state, goal)
 
                 # Get LLM response
-                raw_response = self.llm_client.create_completion_text([{"role": "user", "content": prompt}])
+                # Stop generation as soon as the Action JSON is complete; the parser ignores anything after it
+                # Not cached: turn decisions are sampled, and a retried goal must be able to take a different path
+                raw_response = self.llm_client.create_completion_text_streamed(messages, stop_when=_has_complete_action)
 
                 # Parse response
                 parsed_response = self._parse_provisioner_response(raw_response)
 
                 if show_live_updates:
-                    print(f"{Colors.YELLOW}💭 Thought:{Colors.RESET} {parsed_response.thought}")
-                    print(f"{Colors.BLUE}🛠️  Action:{Colors.RESET} {parsed_response.action}")
+                    self._emit(f"{Colors.YELLOW}💭 Thought:{Colors.RESET} {parsed_response.thought}")
+                    self._emit(f"{Colors.BLUE}🛠️  Action:{Colors.RESET} {parsed_response.action}")
 
                 # Check for completion
                 if parsed_response.is_finish:
                     logger.info("Tool provisioning agent indicated completion")
 
                     if show_live_updates:
-                        print(f"\n{Colors.GREEN}🎉 Tool provisioning completed!{Colors.RESET}")
+                        self._emit(f"\n{Colors.GREEN}🎉 Tool provisioning completed!{Colors.RESET}")
                         success = parsed_response.action.get('parameters', {}).get('success', False)
                         if success:
                             tool_name = parsed_response.action.get('parameters', {}).get('tool_name', 'unknown')
                             method = parsed_response.action.get('parameters', {}).get('installation_method', 'unknown')
-                            print(f"{Colors.GREEN}✅ Successfully installed '{tool_name}' via {method}{Colors.RESET}")
+                            self._emit(f"{Colors.GREEN}✅ Successfully installed '{tool_name}' via {method}{Colors.RESET}")
                         else:
                             message = parsed_response.action.get('parameters', {}).get('message', 'Installation failed')
-                            print(f"{Colors.RED}❌ {message}{Colors.RESET}")
+                            self._emit(f"{Colors.RED}❌ {message}{Colors.RESET}")
 
                     # Return the finish result directly
                     result = parsed_response.action
@@ -131,11 +803,14 @@ class ToolProvisioningAgent:
                     # Ensure proper structure
                     if not isinstance(result, dict):
                         result = {"success": False, "message": "Invalid finish result"}
+                    elif result.get("parameters", {}).get("success"):
+                        self._remember_install(goal, state, result["parameters"])
 
                     # Add execution metadata
                     result["execution_time"] = time.time() - start_time
                     result["turns_taken"] = state.turn_count + 1
 
+                    self._flush_live_updates()
                     return result
 
                 # Check for potential loops before executing
@@ -143,23 +818,21 @@ class ToolProvisioningAgent:
                     logger.warning(f"Potential loop detected, forcing alternative approach")
                     observation = "LOOP_DETECTED: This command or similar has been tried before. You must try a completely different approach or finish with failure if no alternatives remain."
                     if show_live_updates:
-                        print(f"{Colors.YELLOW}⚠️  Loop detected - forcing alternative approach{Colors.RESET}")
+                        self._emit(f"{Colors.YELLOW}⚠️  Loop detected - forcing alternative approach{Colors.RESET}")
                 else:
                     if show_live_updates:
-                        print(f"{Colors.DIM}Executing action...{Colors.RESET}")
+                        self._emit(f"{Colors.DIM}Executing action...{Colors.RESET}")
+                        # Actions may print or prompt for input themselves
+                        self._flush_live_updates()
                     # Execute action
                     observation = self._execute_provisioner_action(parsed_response.action)
 
+                status = _observation_status(observation)
+
                 if show_live_updates:
                     # Display observation with appropriate coloring
-                    if observation.startswith("ERROR") or observation.startswith("FAILED"):
-                        print(f"{Colors.RED}👀 Observation:{Colors.RESET} {observation}")
-                    elif observation.startswith("SUCCESS"):
-                        print(f"{Colors.GREEN}👀 Observation:{Colors.RESET} {observation}")
-                    elif observation.startswith("LOOP_DETECTED"):
-                        print(f"{Colors.YELLOW}👀 Observation:{Colors.RESET} {observation}")
-                    else:
-                        print(f"{Colors.CYAN}👀 Observation:{Colors.RESET} {observation}")
+                    color = _OBSERVATION_COLORS.get(status, Colors.CYAN)
+                    self._emit(f"{color}👀 Observation:{Colors.RESET} {observation}")
 
                 # Add to scratchpad
                 turn_duration = int((time.time() - turn_start) * 1000)
@@ -168,19 +841,37 @@ class ToolProvisioningAgent:
                     thought=parsed_response.thought,
                     action=parsed_response.action,
                     observation=observation,
+                    display_observation=self._truncate_observation(observation),
+                    status=status,
+                    failed=_observation_failed(observation),
                     duration_ms=turn_duration
                 )
 
                 state.scratchpad.append(scratchpad_entry)
                 state.turn_count += 1
 
+                # The requested tool is already installed; no need for another LLM turn to finish
+                installed_result = self._already_installed_result(goal, parsed_response.action, observation, status)
+                if installed_result:
+                    if show_live_updates:
+                        self._emit(f"\n{Colors.GREEN}🎉 Tool provisioning completed!{Colors.RESET}")
+                        self._emit(f"{Colors.GREEN}✅ '{installed_result['tool_name']}' is already installed{Colors.RESET}")
+                    installed_result["execution_time"] = time.time() - start_time
+                    installed_result["turns_taken"] = state.turn_count
+                    self._flush_live_updates()
+                    return installed_result
+
                 # Intelligent failure detection - if we've had multiple failures, suggest finishing
                 if self._should_suggest_finishing(state):
                     logger.info("Multiple failures detected, will suggest finishing on next turn")
                     if show_live_updates:
-                        print(f"{Colors.YELLOW}💡 Multiple failures detected - suggesting finish on next turn{Colors.RESET}")
+                        self._emit(f"{Colors.YELLOW}💡 Multiple failures detected - suggesting finish on next turn{Colors.RESET}")
                     observation += "\n\nSUGGESTION: Consider finishing with failure and providing alternatives after this many failed attempts."
 
+                self._flush_live_updates()
+
+            self._flush_live_updates()
+
             # If we exit the loop without completion, return timeout failure
             return {
                 "success": False,
@@ -193,6 +884,7 @@ class ToolProvisioningAgent:
             }
 
         except Exception as e:
+            self._flush_live_updates()
             logger.error(f"Tool Provisioning Agent error: {e}")
             return {
                 "success": False,
@@ -203,151 +895,238 @@ class ToolProvisioningAgent:
                 "suggested_alternatives": self._suggest_alternatives(goal)
             }
 
-    def _build_provisioner_prompt(self, state: ReActState, goal: str) -> str:
-        """Build specialized prompt for tool provisioning."""
-
-        # Build history if any
-        history = ""
-        if state.scratchpad:
-            history_parts = ["PREVIOUS ATTEMPTS:"]
-            for entry in state.scratchpad:
-                history_parts.extend([
-                    f"Turn {entry.turn}:",
-                    f"Thought: {entry.thought}",
-                    f"Action: {entry.action}",
-                    f"Observation: {entry.observation[:500]}{'...' if len(entry.observation) > 500 else ''}",
-                    ""
-                ])
-            history = "\n".join(history_parts)
-
-        prompt = f"""You are a specialized Tool Provisioning Agent. Your ONLY job is to find and install the requested tool.
-
-GOAL: {goal}
-
-AVAILABLE ACTIONS:
-1. execute_shell - Run shell commands to install tools
-2. check_command_exists - Verify if a tool is already installed
-3. user_confirm - Ask user for permission before risky operations (auto-approved in auto mode)
-4. user_prompt - Ask user for guidance when stuck or need information
-5. ask_llm_for_instructions - Get installation instructions from LLM for a specific tool and platform
-6. web_search_for_tool - Search web for tool installation troubleshooting or alternatives
-7. finish - Complete the task with structured results
-
-RESPONSE FORMAT (MANDATORY):
-Thought: [Your reasoning]
-Intent: provision_tool
-Action: {{"tool_name": "action_name", "parameters": {{"param": "value"}}}}
-
-RULES:
-1. Always include Thought, Intent, and Action lines
-2. Intent must always be "provision_tool" for this agent
-3. Action must be valid JSON with double quotes only
-4. No single quotes, no trailing commas, no extra text after JSON
-5. Parameters must be a JSON object, even if empty
-
-EXAMPLES:
-Thought: Checking if tool exists
-Intent: provision_tool
-Action: {{"tool_name": "check_command_exists", "parameters": {{"command_name": "rg"}}}}
-
-Thought: Need permission to install system packages
-Intent: provision_tool
-Action: {{"tool_name": "user_confirm", "parameters": {{"message": "Install ripgrep via homebrew (requires system changes)?", "default_yes": true}}}}
-
-Thought: Installing the tool
-Intent: provision_tool
-Action: {{"tool_name": "execute_shell", "parameters": {{"command": "brew install ripgrep"}}}}
-
-Thought: Need to understand what type of tool this is and correct installation method
-Intent: provision_tool
-Action: {{"tool_name": "ask_llm_for_instructions", "parameters": {{"tool_name": "scrubcsv", "platform": "macOS"}}}}
-
-Thought: LLM instructions failed, searching web for installation alternatives
-Intent: provision_tool
-Action: {{"tool_name": "web_search_for_tool", "parameters": {{"tool_name": "reconcile-csv", "query": "reconcile-csv installation rust crates"}}}}
-
-Thought: Multiple installation methods failed, need user guidance
-Intent: provision_tool
-Action: {{"tool_name": "user_prompt", "parameters": {{"question": "Failed to install via pip, brew, and apt. Do you have a preferred package manager or should I try building from source?"}}}}
-
-
-Thought: Task completed successfully
-Intent: provision_tool
-Action: {{"tool_name": "finish", "parameters": {{"success": true, "tool_name": "ripgrep", "message": "Installed via brew"}}}}
+    def _emit(self, text: str = "", end: str = "\n") -> None:
+        """Queue a live-update line; queued output is written in one go by _flush_live_updates."""
+        self._live_buffer.append(text + end)
+
+    def _flush_live_updates(self) -> None:
+        """Write queued live-update output to stdout with a single write."""
+        if self._live_buffer:
+            sys.stdout.write("".join(self._live_buffer))
+            sys.stdout.flush()
+            self._live_buffer.clear()
+
+    def _install_memo_key(self, goal: str) -> Optional[str]:
+        """Memo key for the tool named in the goal on this OS, or None for open-ended goals."""
+        tool = self._parse_goal(goal)["tool"]
+        if not tool:
+            return None
+        return f"{tool.lower()}|{HOST_PLATFORM}"
+
+    def _try_install_memo(self, goal: str, show_live_updates: bool) -> Optional[dict]:
+        """
+        Resolve the goal from the install memo without consulting the LLM.
 
-INSTALLATION STRATEGIES (try in order):
-1. First check if tool already exists with check_command_exists
-2. **ASK PERMISSION** before system changes with user_confirm (automatically approved in auto mode)
-3. Package managers (prioritize by OS): macOS=brew, Linux=apt/yum, Windows=chocolatey
-4. **CLI applications**: pipx install (preferred for Python CLI tools like radon, black, flake8)
-5. Language-specific managers: Python=pip/pip3 (only for project dependencies in venv), Node=npm/yarn, Rust=cargo
-6. Alternative package names: try common variations (xsv vs rust-xsv)
-7. **IF STANDARD METHODS FAIL**: Use ask_llm_for_instructions to get tool-specific installation knowledge
-8. **IF LLM INSTRUCTIONS FAIL**: Use web_search_for_tool to find troubleshooting info and alternatives
-9. **ASK FOR GUIDANCE** if still stuck with user_prompt
-10. Direct downloads or source compilation as last resort
-11. Finish with failure and suggest alternatives if all methods fail
+        Returns a success result if the remembered command is already on PATH, or if the
+        remembered install command succeeds in auto mode; otherwise None to run the normal loop.
+        """
+        memo_key = self._install_memo_key(goal)
+        entry = _get_install_memo().get(memo_key) if memo_key else None
+        if not entry:
+            return None
+        # Entries written before expiry tracking have no timestamp; let them be re-learned
+        if time.time() - entry.get("remembered_at", 0) >= INSTALL_MEMO_TTL_SECONDS:
+            self._forget_install(memo_key, "expired")
+            return None
+
+        verification = entry.get("verification", "")
+        path = self._which(verification) if verification else None
+        method = entry.get("method", "install memo")
+
+        # Re-running a remembered install is a system change; only do it unattended in auto mode
+        if not path and self.auto_mode and entry.get("command"):
+            logger.info(f"Install memo hit for {memo_key}, running: {entry['command']}")
+            if show_live_updates:
+                self._emit(f"{Colors.DIM}Using remembered install command: {entry['command']}{Colors.RESET}")
+                self._flush_live_updates()
+            observation = self._execute_shell_action({"command": entry["command"]})
+            if observation.startswith("SUCCESS"):
+                path = self._which(verification)
+            if not path:
+                self._forget_install(memo_key, "replay did not produce a working command")
+                return None
+
+        if not path:
+            return None
+
+        logger.info(f"Install memo resolved {memo_key} to {path}")
+        if show_live_updates:
+            self._emit(f"{Colors.GREEN}✅ '{verification}' available at {path} (known install, skipped planning){Colors.RESET}")
+
+        return {
+            "success": True,
+            "tool_name": entry.get("tool_name", verification),
+            "installation_method": method,
+            "message": f"Resolved from install memo: {entry.get('command', '')}",
+            "tool_path": path,
+            "verification_command": verification,
+            "turns_taken": 0
+        }
 
-IMPORTANT RULES:
-- ALWAYS start by checking if tool already exists with check_command_exists
-- **CHOOSE INSTALLATION METHOD WISELY**:
-  • CLI tools (radon, black, flake8, pylint, etc.) → Use pipx install
-  • Project dependencies (libraries) → Use pip install in venv
-  • System tools → Use brew/apt/package manager
-- **ENVIRONMENT RULES**:
-  • Virtual environment is automatically created at agent startup
-  • Use pip install (in venv) for project dependencies only
-  • Never use --user --break-system-packages (venv handles isolation)
-- **LLM KNOWLEDGE GATHERING & WEB SEARCH**:
-  • Use ask_llm_for_instructions when standard package managers fail
-  • If LLM instructions fail or return no results, use web_search_for_tool for troubleshooting
-  • Web search can identify common issues (wrong tool type, package not published, etc.)
-  • Extract tool name from goal and current platform info for queries
-- **USER INTERACTION RULES**:
-  • Use user_confirm BEFORE installing packages (system changes need permission)
-  • Use ask_llm_for_instructions BEFORE user_prompt when installations fail
-  • Use user_prompt AFTER LLM instructions fail (ask for guidance/preferences)
-  • Use user_prompt when multiple approaches exist (let user choose)
-  • Use user_prompt for missing info (API tokens, custom repos, etc.)
-- Some packages provide multiple commands (e.g., csvkit provides csvcut, csvstat, csvlook, csvgrep)
-- The check_command_exists tool is smart - use the package name and it will check for all relevant commands
-- Detect OS to prioritize correct package managers (macOS=brew, Linux=apt/yum)
-- Try package variations if base name fails (e.g., 'xsv' then 'rust-xsv')
-- For Python tools: try 'pip install' then 'pip3 install' then 'pip install --user'
-- Verify installation by re-checking command exists after install attempt using the PACKAGE NAME
-- Finish early with success when tool is found/installed successfully
-- After 2-3 different installation attempts fail, use ask_llm_for_instructions to get tool-specific knowledge
-- If LLM instructions also fail, then ask user for guidance before giving up
+    def _remember_install(self, goal: str, state: ReActState, finish_params: Dict[str, Any]) -> None:
+        """Record the last successful command that installed this tool, for this OS."""
+        memo_key = self._install_memo_key(goal)
+        if not memo_key:
+            return
 
-LOOP PREVENTION - CRITICAL:
-- NEVER repeat the exact same command that failed before
-- Learn from PREVIOUS ATTEMPTS: if 'pip install xsv' failed, try 'brew install xsv' not 'pip install xsv' again
-- Try systematic variations: different package managers, different package names, different flags
-- Package name variations: tool → py-tool → python-tool → tool-cli → rust-tool
-- If 2+ attempts with same package manager failed, switch to different manager
-- If installation fails but should succeed, check if command now exists anyway
+        verification = (finish_params.get("verification_command") or "").split()
+        if verification:
+            verification_name = verification[0]
+        elif finish_params.get("tool_path"):
+            verification_name = os.path.basename(finish_params["tool_path"])
+        else:
+            verification_name = finish_params.get("tool_name", "")
+        if not verification_name:
+            return
 
-COMMON TOOL INSTALLATION PATTERNS:
-- Rust tools (scrubcsv, ripgrep, fd, exa, bat): brew install rust && cargo install <tool>
-- Go tools: go install github.com/author/<tool>@latest
-- Node tools: npm install -g <tool>
-- Python tools with system deps: brew install <deps> && pip install <tool>
-- Tools with custom installers: curl <url> | sh
-- Language-specific package managers often work better than system ones
+        # Only an install of this tool is worth replaying, not e.g. a trailing 'brew update' or 'which'
+        tool_names = [self._parse_goal(goal)["tool"], finish_params.get("tool_name", ""), verification_name]
+        winning_command = None
+        for entry in reversed(state.scratchpad):
+            command = _shell_command(entry.action)
+            if (command and self._entry_status(entry) is ObservationStatus.SUCCESS
+                    and _command_installs(command, tool_names)):
+                winning_command = command
+                break
+        if not winning_command:
+            return  # Tool was already present, or no install command matched it
+
+        memo = _get_install_memo()
+        memo[memo_key] = {
+            "command": winning_command,
+            "verification": verification_name,
+            "tool_name": finish_params.get("tool_name", verification_name),
+            "method": finish_params.get("installation_method", "unknown"),
+            "remembered_at": time.time()
+        }
+        _save_json_cache(INSTALL_MEMO_FILE, memo)
 
-FINISH ACTION STRUCTURE:
-Success: {{"tool_name": "finish", "parameters": {{"success": true, "tool_name": "<name>", "installation_method": "<method>", "message": "<details>", "tool_path": "<path>", "verification_command": "<cmd>"}}}}
+    def _forget_install(self, memo_key: str, reason: str) -> None:
+        """Drop a memo entry so the next run plans the install from scratch."""
+        memo = _get_install_memo()
+        if memo.pop(memo_key, None) is not None:
+            logger.info(f"Dropping install memo for {memo_key}: {reason}")
+            _save_json_cache(INSTALL_MEMO_FILE, memo)
 
-Failure: {{"tool_name": "finish", "parameters": {{"success": false, "tool_name": "<name>", "message": "<error_details>", "error_type": "<type>", "attempted_methods": ["<method1>", "<method2>"], "suggested_alternatives": ["<alt1>", "<alt2>"], "fallback_commands": ["<cmd1>", "<cmd2>"]}}}}
+    def _already_installed_result(self, goal: str, action: Dict[str, Any], observation: str,
+                                  status: ObservationStatus) -> Optional[dict]:
+        """
+        Build a finish result when a command check found the tool named in the goal.
 
-{history}
+        Only applies to goals naming a specific tool, so checks of prerequisites
+        (pip, brew, ...) or candidates for open-ended goals keep the loop going.
+        """
+        if action.get("tool_name") != "check_command_exists" or status is not ObservationStatus.SUCCESS:
+            return None
+        tool = self._parse_goal(goal)["tool"]
+        if not tool:
+            return None
+
+        checked = {name.lower() for name in self._get_check_command_names(action.get("parameters", {}))}
+        if tool.lower() not in checked:
+            return None
+        path = self._which(tool)
+        if not path:
+            return None
+
+        return {
+            "success": True,
+            "tool_name": tool,
+            "installation_method": "already_installed",
+            "message": observation,
+            "tool_path": path,
+            "verification_command": tool
+        }
 
-CURRENT TURN {state.turn_count + 1}:
-What should you do next to install the requested tool?
+    def _build_provisioner_messages(self, state: ReActState, goal: str) -> List[Dict[str, str]]:
+        """Build chat messages: static system instructions first, per-turn context last."""
+        return [
+            {"role": "system", "content": PROVISIONER_SYSTEM_PROMPT},
+            {"role": "user", "content": self._build_provisioner_prompt(state, goal)}
+        ]
 
-Your response:"""
+    def _build_provisioner_prompt(self, state: ReActState, goal: str) -> str:
+        """Build the dynamic part of the provisioning prompt (goal, history, current turn)."""
+
+        # Nothing changed since the last build (e.g. a retry after a parse error)
+        prompt_key = (len(state.scratchpad), state.turn_count, goal)
+        if self._history_state is state and prompt_key == self._last_prompt_key:
+            return self._last_prompt
+
+        # Scratchpad entries are append-only within a run, so only render new ones
+        if self._history_state is not state or len(self._history_blocks) > len(state.scratchpad):
+            self._history_state = state
+            self._history_blocks = []
+            self._history_summaries = []
+            self._history_chars = 0
+        for entry in state.scratchpad[len(self._history_blocks):]:
+            block = self._format_history_entry(entry)
+            self._history_blocks.append(block)
+            self._history_summaries.append(self._summarize_history_entry(entry))
+            self._history_chars += len(block)
 
-        return prompt
+        history = ""
+        if self._history_blocks:
+            blocks = self._history_blocks
+            # Past the budget, older turns collapse to one line each so the prompt stays bounded
+            if self._history_chars > HISTORY_CHAR_BUDGET and len(blocks) > HISTORY_RECENT_TURNS:
+                summary = "Earlier turns (summarized):\n" + "\n".join(self._history_summaries[:-HISTORY_RECENT_TURNS]) + "\n\n"
+                blocks = [summary] + blocks[-HISTORY_RECENT_TURNS:]
+            # Drop the final separator so spacing matches the line-joined layout
+            history = "PREVIOUS ATTEMPTS:\n" + "".join(blocks)[:-1]
+
+        self._last_prompt_key = prompt_key
+        self._last_prompt = "".join([
+            "GOAL: ", goal, "\n\n",
+            history,
+            PROMPT_TURN_TAIL.format(turn=state.turn_count + 1)
+        ])
+        return self._last_prompt
+
+    @staticmethod
+    def _entry_status(entry: ScratchpadEntry) -> ObservationStatus:
+        """Status recorded on a scratchpad entry, classifying the observation for entries built without one."""
+        if entry.status is not None:
+            return _OBSERVATION_STATUSES.get(entry.status, ObservationStatus.OTHER)
+        return _observation_status(entry.observation)
+
+    @staticmethod
+    def _entry_failed(entry: ScratchpadEntry) -> bool:
+        """Failure flag recorded on a scratchpad entry, checking the observation for entries built without one."""
+        if entry.failed is not None:
+            return entry.failed
+        return _observation_failed(entry.observation)
+
+    @staticmethod
+    def _truncate_observation(observation: str) -> str:
+        """Shorten an observation to the length shown in prompt history."""
+        if len(observation) > HISTORY_OBSERVATION_LIMIT:
+            return observation[:HISTORY_OBSERVATION_LIMIT] + '...'
+        return observation
+
+    @classmethod
+    def _format_history_entry(cls, entry: ScratchpadEntry) -> str:
+        """Render one scratchpad entry for the prompt history."""
+        observation = entry.display_observation
+        if observation is None:
+            observation = cls._truncate_observation(entry.observation)
+        return f"Turn {entry.turn}:\nThought: {entry.thought}\nAction: {entry.action}\nObservation: {observation}\n\n"
+
+    @staticmethod
+    def _summarize_history_entry(entry: ScratchpadEntry) -> str:
+        """One-line extractive summary of a scratchpad entry: action, key argument, outcome."""
+        tool_name = entry.action.get("tool_name", "unknown")
+        params = entry.action.get("parameters", {})
+        if tool_name == "execute_shell":
+            detail = params.get("command", "")
+        elif tool_name == "check_command_exists":
+            detail = ", ".join(params.get("command_names") or [params.get("command_name", "")])
+        else:
+            detail = json.dumps(params, default=str)
+        if len(detail) > 100:
+            detail = detail[:100] + "..."
+        status = entry.observation.split(":", 1)[0][:30]
+        return f"- Turn {entry.turn}: {tool_name} {detail} -> {status}"
 
     def _parse_provisioner_response(self, raw_response: str) -> ParsedLLMResponse:
         """Parse Tool Provisioning Agent response using unified ReAct parser."""
@@ -360,11 +1139,7 @@ Your response:"""
                 return self._handle_llm_refusal(raw_response)
 
             # Use the same parser as the goal-oriented ReAct agent
-            from reactor.agent_controller import AgentController
-
-            # Create a temporary agent controller to use its parser
-            temp_controller = AgentController(None)  # Registry not needed for parsing
-            return temp_controller._parse_llm_response(raw_response)
+            return self._get_response_parser()._parse_llm_response(raw_response)
 
         except Exception as e:
             logger.error(f"Parse error: {e}")
@@ -375,19 +1150,17 @@ Your response:"""
                 raw_response=raw_response
             )
 
+    @classmethod
+    def _get_response_parser(cls):
+        """Return the shared ReAct response parser, creating it on first use."""
+        if cls._response_parser is None:
+            from reactor.agent_controller import AgentController
+            cls._response_parser = AgentController(None)  # Registry not needed for parsing
+        return cls._response_parser
+
     def _is_llm_refusal(self, response: str) -> bool:
         """Check if the response is an LLM refusal."""
-        refusal_patterns = [
-            "i'm sorry, but i can't assist",
-            "i cannot assist",
-            "i'm unable to help",
-            "i can't help with that",
-            "i cannot help with that",
-            "that's not something i can help with"
-        ]
-
-        response_lower = response.lower().strip()
-        return any(pattern in response_lower for pattern in refusal_patterns)
+        return _REFUSAL_RE.search(response) is not None
 
     def _handle_llm_refusal(self, raw_response: str) -> ParsedLLMResponse:
         """Handle LLM refusal by suggesting to finish with failure."""
@@ -430,6 +1203,10 @@ Your response:"""
                 return self._execute_ask_llm_for_instructions_action(parameters)
             elif tool_name == "web_search_for_tool":
                 return self._execute_web_search_for_tool_action(parameters)
+            elif tool_name == "probe_install_candidates":
+                return self._execute_probe_install_candidates_action(parameters)
+            elif tool_name == "probe_package_managers":
+                return self._execute_probe_package_managers_action(parameters)
             elif tool_name == "finish":
                 # Finish actions are handled at the loop level
                 return f"FINISH: {parameters}"
@@ -442,8 +1219,6 @@ Your response:"""
 
     def _execute_shell_action(self, parameters: Dict[str, Any]) -> str:
         """Execute shell command for provisioner."""
-        import subprocess
-
         command = parameters.get("command", "")
         if not command:
             return "ERROR: No command provided"
@@ -454,24 +1229,28 @@ Your response:"""
             logger.info(f"Provisioner executing: {command}")
 
             # Display command line for transparency like react agent
-            print(f"💻 Command: {command}")
+            # Flushed before running so the command shows while it executes
+            self._emit(f"💻 Command: {command}")
+            self._flush_live_updates()
 
-            result = subprocess.run(
+            return_code, stdout, stderr = _run_with_bounded_output(
                 command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=120  # 2 minute timeout for installations
+                timeout=SHELL_TIMEOUT_SECONDS,
+                limit=SHELL_OUTPUT_LIMIT
             )
 
             output_parts = []
-            if result.stdout:
-                output_parts.append(f"stdout: {result.stdout[:1000]}")
-            if result.stderr:
-                output_parts.append(f"stderr: {result.stderr[:1000]}")
-
-            status = "SUCCESS" if result.returncode == 0 else "FAILED"
-            output_parts.append(f"return_code: {result.returncode}")
+            if stdout:
+                output_parts.append(f"stdout: {stdout}")
+            if stderr:
+                output_parts.append(f"stderr: {stderr}")
+
+            status = "SUCCESS" if return_code == 0 else "FAILED"
+            if return_code == 0:
+                # A successful command may have installed new binaries or Python packages
+                ToolProvisioningAgent._path_index_dirty = True
+                _failed_module_imports.clear()
+            output_parts.append(f"return_code: {return_code}")
 
             return f"{status}: {' | '.join(output_parts)}"
 
@@ -481,27 +1260,97 @@ Your response:"""
             return f"ERROR: Command execution failed: {str(e)}"
 
     def _execute_check_command_action(self, parameters: Dict[str, Any]) -> str:
-        """Execute command existence check for provisioner."""
-        command_name = parameters.get("command_name", "")
-        if not command_name:
+        """Execute command existence check for provisioner (one name or a batch of candidates)."""
+        command_names = self._get_check_command_names(parameters)
+        if not command_names:
             return "ERROR: No command_name provided"
 
         # Always use simple shutil.which check - don't rely on LLM guessing commands
         # The complex goal-aware approach was causing false positives where LLM would
         # incorrectly identify standard Unix commands (join, write) as belonging to csvfix
-        path = shutil.which(command_name)
-        if path:
-            return f"SUCCESS: Command '{command_name}' found at: {path}"
+        if len(command_names) == 1:
+            command_name = command_names[0]
+            path = self._which(command_name)
+            if path:
+                return f"SUCCESS: Command '{command_name}' found at: {path}"
+            else:
+                return f"NOT_FOUND: Command '{command_name}' not available on system"
+
+        results = self._which_many(command_names)
+        found = [name for name, path in results.items() if path]
+        summary = " | ".join(f"{name}: {path or 'not found'}" for name, path in results.items())
+        if found:
+            return f"SUCCESS: Found {len(found)} of {len(command_names)} commands | {summary}"
+        return f"NOT_FOUND: None of {len(command_names)} commands available on system | {summary}"
+
+    @staticmethod
+    def _get_check_command_names(parameters: Dict[str, Any]) -> List[str]:
+        """Collect the command names for a check_command_exists action, de-duplicated and capped."""
+        command_names = parameters.get("command_names") or [parameters.get("command_name", "")]
+        if isinstance(command_names, str):
+            command_names = [command_names]
+        names = [str(name).strip() for name in command_names if name and str(name).strip()]
+        return list(dict.fromkeys(names))[:MAX_CHECK_COMMANDS]
+
+    def _which(self, command_name: str) -> Optional[str]:
+        """Resolve a command via the cached PATH index, falling back to shutil.which on a miss."""
+        return self._which_many([command_name])[command_name]
+
+    def _which_many(self, command_names: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve several commands; index misses fall back to shutil.which concurrently."""
+        cls = ToolProvisioningAgent
+        # PATHEXT changes which names shutil.which resolves on Windows, so it is part of the key
+        index_key = (tuple(os.get_exec_path()), os.environ.get("PATHEXT", ""))
+        if cls._path_index is None or cls._path_index_dirty or cls._path_index_key != index_key:
+            cls._path_index = self._build_path_index()
+            cls._path_index_key = index_key
+            cls._commands_not_found.clear()
+            cls._path_index_dirty = False
+
+        results: Dict[str, Optional[str]] = {}
+        pending = []
+        for command_name in command_names:
+            path = cls._path_index.get(command_name)
+            if path and os.access(path, os.X_OK):
+                results[command_name] = path
+            elif command_name in cls._commands_not_found:
+                results[command_name] = None
+            else:
+                pending.append(command_name)
+
+        # Non-executable shadows, PATHEXT names and explicit paths go through shutil.which;
+        # its stat calls release the GIL, so several misses are looked up in parallel
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_CHECK_COMMANDS, len(pending))) as executor:
+                found = list(executor.map(shutil.which, pending))
         else:
-            return f"NOT_FOUND: Command '{command_name}' not available on system"
+            found = [shutil.which(command_name) for command_name in pending]
+
+        for command_name, path in zip(pending, found):
+            if path:
+                cls._path_index[command_name] = path
+            else:
+                cls._commands_not_found.add(command_name)
+            results[command_name] = path
+        return {command_name: results[command_name] for command_name in command_names}
+
+    def _build_path_index(self) -> Dict[str, str]:
+        """Scan every PATH directory once, mapping file names to their first match."""
+        index = {}
+        for directory in os.get_exec_path():
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # Directory entry types come from scandir itself; no stat per file
+                        if entry.name not in index and not entry.is_dir():
+                            index[entry.name] = entry.path
+            except OSError:
+                continue
+        return index
 
     def _parse_goal(self, goal: str) -> dict:
         """Parse goal in format 'I need [tool] to do [purpose]' or 'I need any tool to do [purpose]'."""
-        import re
-
-        # Pattern: "I need <tool> to do <purpose>" or "I need any tool to do <purpose>"
-        pattern = r"I need (?P<tool>[\w\-]+|any tool) to (?:do )?(?P<purpose>.*)"
-        match = re.search(pattern, goal, re.IGNORECASE)
+        match = _GOAL_RE.search(goal)
 
         if match:
             tool = match.group("tool")
@@ -513,17 +1362,15 @@ Your response:"""
             }
 
         # Fallback: try to extract from free-form goal
-        if "to do" in goal.lower():
-            parts = goal.lower().split("to do", 1)
-            if len(parts) == 2:
-                return {"tool": None, "purpose": parts[1].strip(), "raw_goal": goal}
+        _, separator, purpose = goal.lower().partition("to do")
+        if separator:
+            return {"tool": None, "purpose": purpose.strip(), "raw_goal": goal}
 
         return {"tool": None, "purpose": goal, "raw_goal": goal}
 
 
     def _execute_user_confirm_action(self, parameters: Dict[str, Any]) -> str:
         """Execute user confirmation for provisioner."""
-        from tools.file_system import user_confirm, UserConfirmInput
 
         try:
             # In auto mode, automatically approve all confirmations
@@ -549,7 +1396,6 @@ Your response:"""
 
     def _execute_user_prompt_action(self, parameters: Dict[str, Any]) -> str:
         """Execute user prompt for provisioner."""
-        from tools.file_system import user_prompt, UserPromptInput
 
         try:
             inputs = UserPromptInput(
@@ -579,18 +1425,16 @@ Your response:"""
             if not tool_name:
                 return "ERROR: No tool_name provided"
 
-            # Detect platform if not provided
+            # Use the detected platform if not provided
             if not platform:
-                import platform as plat
-                system = plat.system().lower()
-                if system == "darwin":
-                    platform = "macOS"
-                elif system == "linux":
-                    platform = "Linux"
-                elif system == "windows":
-                    platform = "Windows"
-                else:
-                    platform = system
+                platform = HOST_PLATFORM
+
+            # Installation knowledge for a (tool, platform) pair doesn't change between turns or runs
+            cache_key = f"{tool_name.lower()}|{platform}"
+            cached_commands = _lookup_install_instructions(cache_key)
+            if cached_commands:
+                logger.info(f"Using cached installation instructions for {tool_name} on {platform}")
+                return f"LLM_INSTRUCTIONS: Installation commands for {tool_name} on {platform}:\n{cached_commands}"
 
             prompt = f"""How to install tool '{tool_name}' - give me step by step shell commands for platform {platform}
 
@@ -628,23 +1472,22 @@ Return only the commands, no explanations. If unsure about the tool, provide the
 
             logger.info(f"Asking LLM for installation instructions for {tool_name} on {platform}")
 
-            response = self.llm_client.create_completion_text([{"role": "user", "content": prompt}])
+            response = self.llm_client.create_completion_text([{"role": "user", "content": prompt}], use_cache=True)
 
             # Clean up the response to extract commands
             commands = []
             for line in response.split('\n'):
                 line = line.strip()
-                if line and not line.startswith('#') and not line.startswith('//'):
-                    # Remove common prefixes that might be in the response
-                    if line.startswith('$ '):
-                        line = line[2:]
-                    elif line.startswith('> '):
+                if line and not line.startswith(('#', '//')):
+                    # Remove common prompt prefixes ("$ ", "> ") that might be in the response
+                    if line[:2] in ('$ ', '> '):
                         line = line[2:]
                     if line:
                         commands.append(line)
 
             if commands:
                 command_list = '\n'.join(commands)
+                _store_install_instructions(cache_key, command_list)
                 return f"LLM_INSTRUCTIONS: Installation commands for {tool_name} on {platform}:\n{command_list}"
             else:
                 return f"LLM_NO_INSTRUCTIONS: Could not determine installation method for {tool_name}"
@@ -673,6 +1516,110 @@ Return only the commands, no explanations. If unsure about the tool, provide the
             logger.error(f"Web search action failed: {e}")
             return f"ERROR: Web search failed: {str(e)}"
 
+    def _execute_probe_install_candidates_action(self, parameters: Dict[str, Any]) -> str:
+        """Run candidate probe commands concurrently and report the first one that succeeds."""
+        commands = _string_list(parameters.get("commands"))
+        if not commands:
+            return "ERROR: No commands provided"
+        commands = commands[:MAX_PROBE_CANDIDATES]
+
+        refused = []
+        for command in commands:
+            try:
+                words = _mutating_probe_words(shlex.split(command))
+            except ValueError:
+                return f"ERROR: Could not parse probe command: {command}"
+            if words:
+                refused.append(f"{command} ({', '.join(words)})")
+        if refused:
+            return (f"ERROR: Probes must be read-only; refused: {'; '.join(refused)}. "
+                    f"Use execute_shell for commands that change the system")
+
+        # Probes run unattended, so always show what is about to run
+        for command in commands:
+            self._emit(f"🔎 Probe: {command}")
+        self._flush_live_updates()
+        logger.info(f"Probing {len(commands)} install candidates concurrently")
+
+        try:
+            results = _run_coroutine(asyncio.wait_for(self._probe_commands(commands), timeout=PROBE_TIMEOUT_SECONDS))
+        except asyncio.TimeoutError:
+            return f"ERROR: Probes timed out after {PROBE_TIMEOUT_SECONDS} seconds"
+
+        summary_parts = []
+        first_success = None
+        for command, result in zip(commands, results):
+            if isinstance(result, Exception):
+                summary_parts.append(f"{command} -> error: {result}")
+                continue
+            return_code, output = result
+            summary_parts.append(f"{command} -> return_code {return_code}")
+            if return_code == 0 and first_success is None:
+                first_success = (command, output)
+
+        summary = " | ".join(summary_parts)
+        if first_success:
+            command, output = first_success
+            return f"SUCCESS: First working candidate: {command} | output: {output[:500]} | results: {summary}"
+        return f"FAILED: No candidate succeeded | results: {summary}"
+
+    def _execute_probe_package_managers_action(self, parameters: Dict[str, Any]) -> str:
+        """Report which package managers are installed, probing their versions concurrently."""
+        managers = _string_list(parameters.get("managers")) or list(KNOWN_PACKAGE_MANAGERS)
+        managers = list(dict.fromkeys(managers))[:MAX_PROBE_CANDIDATES]
+
+        # Only managers present on PATH are worth a subprocess
+        paths = self._which_many(managers)
+        present = [m for m in managers if paths[m]]
+        missing = [m for m in managers if not paths[m]]
+        if not present:
+            return f"NOT_FOUND: No package managers available | checked: {', '.join(managers)}"
+
+        logger.info(f"Probing {len(present)} package managers concurrently")
+        results = _run_coroutine(self._probe_commands(
+            [[paths[m], "--version"] for m in present],
+            timeout=MANAGER_PROBE_TIMEOUT_SECONDS
+        ))
+
+        available = []
+        for manager, result in zip(present, results):
+            if isinstance(result, Exception) or result[0] != 0:
+                available.append(f"{manager} (version unknown)")
+                continue
+            version = result[1].splitlines()[0][:80] if result[1] else "version unknown"
+            available.append(f"{manager} ({version})")
+
+        observation = f"SUCCESS: Available package managers: {', '.join(available)}"
+        if missing:
+            observation += f" | missing: {', '.join(missing)}"
+        return observation
+
+    async def _probe_commands(self, commands: List[Any], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Execute commands (strings split with shlex, or argv lists) with bounded concurrency.
+
+        Exceptions, including a per-command timeout, are returned in place of results rather than raised.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+
+        async def probe(command: str):
+            async with semaphore:
+                argv = shlex.split(command) if isinstance(command, str) else command
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT
+                )
+                try:
+                    stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                return process.returncode, stdout.decode(errors="replace").strip()
+
+        return await asyncio.gather(*(probe(command) for command in commands), return_exceptions=True)
+
     def _simulate_web_search_results(self, tool_name: str, query: str) -> str:
         """Enhanced web search with both simulated and basic real search capabilities."""
 
@@ -690,75 +1637,95 @@ Return only the commands, no explanations. If unsure about the tool, provide the
 
     def _check_known_tool_patterns(self, tool_name: str) -> str:
         """Check against database of known problematic tools."""
-        common_issues = {
-            "reconcile-csv": {
-                "issue": "Tool is Java-based, not available via Cargo",
-                "alternatives": [
-                    "Use qsv (Rust CSV toolkit): cargo install qsv",
-                    "Use csv-diff (Rust CSV comparison): cargo install csv-diff",
-                    "Download original Java version from GitHub"
-                ],
-                "original_location": "https://github.com/rufuspollock-okfn/reconcile-csv"
-            },
-            "scrubcsv": {
-                "issue": "Tool may not be published to crates.io",
-                "alternatives": [
-                    "Use csvkit (Rust): cargo install csvkit",
-                    "Use qsv for CSV processing: cargo install qsv",
-                    "Build from source if GitHub repo exists"
-                ]
-            }
-        }
-
         tool_lower = tool_name.lower()
-        for pattern, info in common_issues.items():
+        key = tool_lower if tool_lower in _KNOWN_TOOL_ADVICE else _KNOWN_TOOL_ALIASES.get(_normalize_tool_name(tool_lower))
+        if key:
+            return _KNOWN_TOOL_ADVICE[key]
+
+        for pattern, advice in _KNOWN_TOOL_ADVICE.items():
             if pattern in tool_lower or tool_lower in pattern:
-                result = f"Found common issue: {info['issue']}. "
-                result += f"Alternatives: {'; '.join(info['alternatives'])}"
-                if 'original_location' in info:
-                    result += f". Original tool: {info['original_location']}"
-                return result
+                return advice
         return None
 
     def _perform_basic_web_search(self, tool_name: str, query: str) -> str:
         """Perform basic web search using DuckDuckGo (no API key required)."""
         try:
-            import requests
-            from urllib.parse import quote
-
             # Use custom query if provided, otherwise default to tool installation
             search_query = query if query.strip() else f"{tool_name} installation"
-            url = f"https://api.duckduckgo.com/?q={quote(search_query)}&format=json&no_html=1"
-
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Extract useful information from the response
-            results = []
 
-            if data.get('Abstract'):
-                results.append(f"Info: {data['Abstract'][:200]}...")
+            cache_key = f"{tool_name}|{search_query}"
+            cached = _web_search_cache.get(cache_key)
+            if cached and time.time() - cached[0] < WEB_SEARCH_CACHE_TTL_SECONDS:
+                logger.debug(f"Using cached web search results for: {search_query}")
+                return cached[1]
 
-            if data.get('AbstractURL'):
-                results.append(f"Source: {data['AbstractURL']}")
+            # Identical searches already in flight (e.g. parallel provisioners) share one request
+            with _web_search_lock:
+                pending = _web_search_inflight.get(cache_key)
+                is_leader = pending is None
+                if is_leader:
+                    pending = Future()
+                    _web_search_inflight[cache_key] = pending
 
-            # Check for related topics
-            if data.get('RelatedTopics'):
-                for topic in data['RelatedTopics'][:3]:  # Limit to 3 related topics
-                    if isinstance(topic, dict) and topic.get('Text'):
-                        results.append(f"Related: {topic['Text'][:100]}...")
+            if not is_leader:
+                logger.debug(f"Waiting on in-flight web search for: {search_query}")
+                return pending.result()
 
-            if results:
-                return f"Web search found: {' | '.join(results)}"
-            else:
-                return self._get_generic_search_advice(tool_name)
+            try:
+                search_results = self._fetch_web_search(tool_name, search_query)
+                pending.set_result(search_results)
+            except Exception as e:
+                pending.set_exception(e)
+                raise
+            finally:
+                with _web_search_lock:
+                    del _web_search_inflight[cache_key]
+
+            _web_search_cache.pop(cache_key, None)
+            _web_search_cache[cache_key] = (time.time(), search_results)
+            if len(_web_search_cache) > WEB_SEARCH_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                del _web_search_cache[next(iter(_web_search_cache))]
+            return search_results
 
         except Exception as e:
             logger.debug(f"Web search API failed: {e}")
             raise e
 
+    def _fetch_web_search(self, tool_name: str, search_query: str) -> str:
+        """Query the DuckDuckGo instant answer API and format the useful parts."""
+        url = f"https://api.duckduckgo.com/?q={quote(search_query)}&format=json&no_html=1"
+
+        # Stream the body so an unexpectedly large answer is abandoned instead of buffered and parsed
+        with _get_web_session().get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=16384):
+                body += chunk
+                if len(body) > WEB_SEARCH_MAX_RESPONSE_BYTES:
+                    raise ValueError(f"Web search response exceeded {WEB_SEARCH_MAX_RESPONSE_BYTES} bytes")
+
+        data = json.loads(body)
+
+        # Extract useful information from the response
+        results = []
+
+        if data.get('Abstract'):
+            results.append(f"Info: {data['Abstract'][:200]}...")
+
+        if data.get('AbstractURL'):
+            results.append(f"Source: {data['AbstractURL']}")
+
+        # Check for related topics
+        if data.get('RelatedTopics'):
+            for topic in data['RelatedTopics'][:3]:  # Limit to 3 related topics
+                if isinstance(topic, dict) and topic.get('Text'):
+                    results.append(f"Related: {topic['Text'][:100]}...")
+
+        if results:
+            return f"Web search found: {' | '.join(results)}"
+        return self._get_generic_search_advice(tool_name)
+
     def _get_generic_search_advice(self, tool_name: str) -> str:
         """Return generic search advice when specific information isn't available."""
         return (f"Web search suggests checking: "
@@ -776,17 +1743,17 @@ Return only the commands, no explanations. If unsure about the tool, provide the
         logger.info(f"Attempting to refresh registry for tool: {tool_name}")
 
         # Strategy 1: Check if it's a Python package with UF decorators
-        try:
-            module = importlib.import_module(tool_name)
+        module = self._import_tool_module(tool_name)
+        if module is not None:
             descriptors = self._scan_module_for_ufs(module)
             for desc in descriptors:
                 self.registry.register_uf(desc)
                 logger.info(f"Registered newly installed UF: {desc.name}")
-        except ImportError:
+        else:
             logger.debug(f"Tool '{tool_name}' is not a Python module")
 
         # Strategy 2: Create a shell command wrapper UF if command is available
-        if shutil.which(tool_name):
+        if self._which(tool_name):
             try:
                 shell_wrapper_uf = self._create_shell_wrapper_uf(tool_name)
                 self.registry.register_uf(shell_wrapper_uf)
@@ -794,21 +1761,48 @@ Return only the commands, no explanations. If unsure about the tool, provide the
             except Exception as e:
                 logger.warning(f"Failed to create shell wrapper for {tool_name}: {e}")
 
+    def _import_tool_module(self, tool_name: str):
+        """Import a tool as a Python module, returning None if it isn't one."""
+        # Names like 'rust-xsv' can never be modules, so skip the import machinery entirely
+        if not all(part.isidentifier() for part in tool_name.split(".")):
+            return None
+        if tool_name in _failed_module_imports:
+            return None
+        try:
+            return importlib.import_module(tool_name)
+        except ImportError:
+            _failed_module_imports.add(tool_name)
+            return None
+
     def _scan_module_for_ufs(self, module) -> List[UFDescriptor]:
         """Scan a module for functions decorated with @uf."""
+        # Reuse results for an unchanged module file; the mtime invalidates edits during development
+        module_file = getattr(module, "__file__", None)
+        cache_key = None
+        if module_file:
+            try:
+                cache_key = (module.__name__, module_file, os.path.getmtime(module_file))
+            except OSError:
+                pass
+        if cache_key in _uf_scan_cache:
+            return list(_uf_scan_cache[cache_key])
+
         descriptors = []
 
         try:
-            for _, func in inspect.getmembers(module, inspect.isfunction):
-                if hasattr(func, '_uf_descriptor'):
+            for func in list(vars(module).values()):
+                if inspect.isfunction(func) and hasattr(func, '_uf_descriptor'):
                     descriptor = getattr(func, '_uf_descriptor')
                     if isinstance(descriptor, UFDescriptor):
                         descriptor.callable_func = func
                         descriptors.append(descriptor)
         except Exception as e:
             logger.warning(f"Error scanning module for UFs: {e}")
+            return descriptors
 
-        return descriptors
+        if cache_key:
+            _uf_scan_cache[cache_key] = descriptors
+        return list(descriptors)
 
     def _create_shell_wrapper_uf(self, tool_name: str) -> UFDescriptor:
         """Create a shell wrapper UF for a command-line tool."""
@@ -830,12 +1824,19 @@ Return only the commands, no explanations. If unsure about the tool, provide the
             }
         )
 
+        # Resolve the executable once; each call then runs it directly unless the args need a shell
+        resolved_path = self._which(tool_name) or tool_name
+
         # Create a wrapper function
         def shell_wrapper(inputs):
-            import subprocess
-            command = f"{tool_name} {inputs.get('args', '')}"
+            args = inputs.get('args', '')
+            arg_list = _simple_argv(args) if args.strip() else []
             try:
-                result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=60)
+                if arg_list is not None:
+                    result = subprocess.run([resolved_path, *arg_list], capture_output=True, text=True, timeout=60)
+                else:
+                    command = f"{tool_name} {args}"
+                    result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=60)
                 return {
                     "stdout": result.stdout,
                     "stderr": result.stderr,
@@ -850,42 +1851,12 @@ Return only the commands, no explanations. If unsure about the tool, provide the
 
     def _suggest_alternatives(self, goal: str) -> List[str]:
         """Suggest alternative approaches when tool installation fails."""
-        alternatives = []
-        goal_lower = goal.lower()
-
-        # Pattern-based suggestions
-        if any(word in goal_lower for word in ["linting", "lint", "ruff", "flake8", "pylint"]):
-            alternatives.extend([
-                "Use Python's built-in ast module for syntax checking",
-                "Implement custom linting with grep patterns for common issues",
-                "Use your IDE's built-in linting features"
-            ])
-        elif any(word in goal_lower for word in ["formatting", "format", "black", "autopep8"]):
-            alternatives.extend([
-                "Use manual formatting following PEP 8 guidelines",
-                "Use simple string manipulation for basic formatting",
-                "Apply formatting rules with sed/awk commands"
-            ])
-        elif any(word in goal_lower for word in ["testing", "test", "pytest", "unittest"]):
-            alternatives.extend([
-                "Use Python's built-in unittest module",
-                "Write custom test scripts with assert statements",
-                "Create simple validation scripts"
-            ])
-        elif any(word in goal_lower for word in ["package", "dependency", "install"]):
-            alternatives.extend([
-                "Download and install manually from source",
-                "Use alternative package managers",
-                "Find equivalent tools already available"
-            ])
-        else:
-            alternatives.extend([
-                "Use built-in system tools for similar functionality",
-                "Implement custom scripts to achieve the same goal",
-                "Search for alternative tools with similar features"
-            ])
+        # Pattern-based suggestions; first matching bucket wins
+        for keywords_re, suggestions in _ALTERNATIVE_BUCKETS:
+            if keywords_re.search(goal):
+                return list(suggestions[:3])
 
-        return alternatives[:3]  # Limit to top 3 suggestions
+        return list(_DEFAULT_ALTERNATIVES[:3])  # Limit to top 3 suggestions
 
     def _detect_potential_loop(self, state: ReActState, new_action: Dict[str, Any]) -> bool:
         """Detect if the agent is about to repeat a failed command or approach."""
@@ -893,6 +1864,12 @@ Return only the commands, no explanations. If unsure about the tool, provide the
             return False
 
         new_tool = new_action.get("tool_name")
+        # Only shell commands and command checks can loop; user prompts and finish never do
+        if new_tool not in ("execute_shell", "check_command_exists"):
+            return False
+        # A name counts as looping after 3 prior checks, which needs at least 3 entries
+        if new_tool == "check_command_exists" and len(state.scratchpad) < 3:
+            return False
         new_params = new_action.get("parameters", {})
 
         # For shell commands, check if we're repeating the same or very similar command
@@ -908,41 +1885,67 @@ Return only the commands, no explanations. If unsure about the tool, provide the
                 logger.debug(f"Too many failures with this package manager: {new_command}")
                 return True
 
-            # Check against previous shell commands for exact repeats
-            for entry in state.scratchpad:
-                if entry.action.get("tool_name") == "execute_shell":
-                    prev_command = entry.action.get("parameters", {}).get("command", "").lower().strip()
+            index = self._sync_action_index(state)
 
-                    # Exact match - always block
-                    if new_command == prev_command:
-                        logger.debug(f"Exact command repeat detected: {new_command}")
-                        return True
+            # Exact match - always block
+            if new_command in index["shell_commands"]:
+                logger.debug(f"Exact command repeat detected: {new_command}")
+                return True
 
-                    # Similar commands only if both failed
-                    prev_failed = entry.observation and ("ERROR" in entry.observation or "FAILED" in entry.observation)
-                    if prev_failed and self._commands_too_similar(new_command, prev_command):
-                        logger.debug(f"Similar failed command detected: {new_command} vs {prev_command}")
+            # Similar commands only if both failed: same package manager and same or near-identical package
+            for pm, package in _install_targets(new_command):
+                failed_packages = index["failed_installs"].get(pm)
+                if not failed_packages:
+                    continue
+                if package in failed_packages:
+                    logger.debug(f"Similar failed command detected: {new_command} ({pm} {package} already failed)")
+                    return True
+                clean_package = _clean_package_name(package)
+                for prev_package, prev_clean in failed_packages.items():
+                    if _cleaned_names_similar(clean_package, prev_clean):
+                        logger.debug(f"Similar failed command detected: {new_command} vs {pm} install {prev_package}")
                         return True
 
         # Check for repeated check_command_exists - more lenient (allow 3 checks)
         elif new_tool == "check_command_exists":
-            new_cmd_name = new_params.get("command_name", "").lower()
-            check_count = sum(1 for entry in state.scratchpad
-                            if entry.action.get("tool_name") == "check_command_exists"
-                            and entry.action.get("parameters", {}).get("command_name", "").lower() == new_cmd_name)
+            new_cmd_names = [name.lower() for name in self._get_check_command_names(new_params)]
+            check_counts = self._sync_action_index(state)["check_counts"]
 
-            if check_count >= 3:  # Allow up to 3 checks for variations
-                logger.debug(f"Too many tool checks detected: {new_cmd_name}")
+            # A batch is only a loop if every name in it has already been checked too often
+            if new_cmd_names and all(check_counts.get(name, 0) >= 3 for name in new_cmd_names):  # Allow up to 3 checks for variations
+                logger.debug(f"Too many tool checks detected: {', '.join(new_cmd_names)}")
                 return True
 
         return False
 
+    def _sync_action_index(self, state: ReActState) -> Dict[str, Any]:
+        """Fold scratchpad entries not yet seen into the per-run action index used for loop checks."""
+        if self._action_index_state is not state or self._action_index["indexed"] > len(state.scratchpad):
+            self._action_index_state = state
+            self._action_index = {"indexed": 0, "shell_commands": set(), "failed_installs": {}, "check_counts": {}}
+
+        index = self._action_index
+        for entry in state.scratchpad[index["indexed"]:]:
+            tool_name = entry.action.get("tool_name")
+            params = entry.action.get("parameters") or {}
+            if tool_name == "execute_shell":
+                command = params.get("command", "").lower().strip()
+                index["shell_commands"].add(command)
+                if self._entry_failed(entry):
+                    for pm, package in _install_targets(command):
+                        # Cleaned once here so later similarity checks reuse it
+                        index["failed_installs"].setdefault(pm, {})[package] = _clean_package_name(package)
+            elif tool_name == "check_command_exists":
+                for cmd_name in self._get_check_command_names(params):
+                    cmd_name = cmd_name.lower()
+                    index["check_counts"][cmd_name] = index["check_counts"].get(cmd_name, 0) + 1
+        index["indexed"] = len(state.scratchpad)
+        return index
+
     def _count_package_manager_failures(self, state: ReActState, command: str) -> int:
         """Count recent failures with the same package manager."""
-        import re
-
         # Extract package manager from command
-        pm_match = re.search(r'^(pip|pip3|brew|apt|apt-get|yum|npm|yarn)\b', command)
+        pm_match = _PACKAGE_MANAGER_RE.match(command)
         if not pm_match:
             return 0
 
@@ -951,111 +1954,94 @@ Return only the commands, no explanations. If unsure about the tool, provide the
 
         # Count recent failures with this package manager
         for entry in state.scratchpad[-3:]:  # Only check last 3 attempts
-            if entry.action.get("tool_name") == "execute_shell":
-                prev_cmd = entry.action.get("parameters", {}).get("command", "")
-                if prev_cmd.startswith(package_manager) and entry.observation:
-                    if "ERROR" in entry.observation or "FAILED" in entry.observation:
-                        failure_count += 1
+            prev_cmd = _shell_command(entry.action)
+            if prev_cmd is not None:
+                if prev_cmd.startswith(package_manager) and self._entry_failed(entry):
+                    failure_count += 1
 
         return failure_count
 
     def _commands_too_similar(self, cmd1: str, cmd2: str) -> bool:
         """Check if two shell commands are too similar (indicating potential loop)."""
-        # Extract key components from commands
-        import re
-
-        # Common package managers
-        package_managers = ["pip", "pip3", "brew", "apt", "apt-get", "yum", "npm", "yarn"]
+        # Only '<pm> install <package>' commands can be too similar; skip the regex otherwise
+        if "install" not in cmd1 or "install" not in cmd2:
+            return False
 
-        for pm in package_managers:
+        # Extract key components from commands
+        targets2 = dict(_install_targets(cmd2))
+        for pm, package1 in _install_targets(cmd1):
             # Check if both commands use same package manager and same base package name
-            pattern = rf"{pm}\s+install\s+([^\s]+)"
-
-            match1 = re.search(pattern, cmd1)
-            match2 = re.search(pattern, cmd2)
-
-            if match1 and match2:
-                package1 = match1.group(1).strip()
-                package2 = match2.group(1).strip()
-
-                # Same package manager + same package = too similar
-                if package1 == package2:
-                    return True
+            package2 = targets2.get(pm)
+            if package2 is None:
+                continue
 
-                # Very similar package names (but allow some legitimate variations)
-                if self._package_names_similar(package1, package2):
-                    return True
+            # Same package manager + same package = too similar
+            if package1 == package2:
+                return True
 
-            # Same package manager but different packages = different approach (OK)
-            elif match1 and match2:
-                return False
+            # Very similar package names (but allow some legitimate variations)
+            if self._package_names_similar(package1, package2):
+                return True
 
+        # Different package managers, or same manager with different packages = different approach (OK)
         return False
 
     def _package_names_similar(self, pkg1: str, pkg2: str) -> bool:
         """Check if package names are very similar."""
-        # Remove common variations
-        clean1 = pkg1.lower().replace("-", "").replace("_", "").replace("python", "").replace("py", "")
-        clean2 = pkg2.lower().replace("-", "").replace("_", "").replace("python", "").replace("py", "")
-
-        # If one is substring of another and they're close in length
-        if clean1 in clean2 or clean2 in clean1:
-            length_diff = abs(len(clean1) - len(clean2))
-            if length_diff <= 2:  # Very close in length
-                return True
-
-        return False
+        return _cleaned_names_similar(_clean_package_name(pkg1), _clean_package_name(pkg2))
 
     def _should_suggest_finishing(self, state: ReActState) -> bool:
         """Determine if we should suggest finishing due to repeated failures."""
         if len(state.scratchpad) < 2:
             return False
+        # More than 4 total turns taken; no need to count failures
+        if len(state.scratchpad) >= 4:
+            return True
 
         # Count recent failures (more aggressive - shorter limit)
         recent_failures = 0
         installation_attempts = 0
 
         for entry in state.scratchpad[-4:]:  # Last 4 attempts
-            observation = entry.observation.upper()
-            action = entry.action
-
             # Count installation attempts vs checks
-            if action.get("tool_name") == "execute_shell":
-                command = action.get("parameters", {}).get("command", "")
-                if any(pm in command for pm in ["install", "brew", "pip", "apt", "yum", "npm"]):
+            command = _shell_command(entry.action)
+            if command is not None:
+                if _INSTALL_KEYWORD_RE.search(command):
                     installation_attempts += 1
 
             # Count failures
-            if any(keyword in observation for keyword in ["ERROR", "FAILED", "NOT FOUND", "COMMAND NOT FOUND", "PERMISSION DENIED", "LOOP_DETECTED"]):
+            if _FAILURE_KEYWORD_RE.search(entry.observation):
                 recent_failures += 1
 
         # Suggest finishing if:
         # - 3+ total failures, OR
-        # - 2+ installation attempts failed, OR
-        # - More than 4 total turns taken
-        return (recent_failures >= 3 or
-                (installation_attempts >= 2 and recent_failures >= 2) or
-                len(state.scratchpad) >= 4)
+        # - 2+ installation attempts failed
+        return recent_failures >= 3 or (installation_attempts >= 2 and recent_failures >= 2)
 
     def _analyze_failure_patterns(self, state: ReActState) -> List[str]:
         """Analyze failure patterns to suggest better approaches."""
-        patterns = []
+        patterns: set = set()
 
-        for entry in state.scratchpad:
-            observation = entry.observation.upper()
+        # Recent turns reflect the current failure mode; older ones only repeat labels
+        for entry in state.scratchpad[-FAILURE_ANALYSIS_WINDOW:]:
+            observation = entry.observation
             action = entry.action
 
-            if "PERMISSION DENIED" in observation:
-                patterns.append("permission_issues")
-            elif "COMMAND NOT FOUND" in observation or "NOT FOUND" in observation:
-                patterns.append("missing_package_manager")
-            elif "NO SUCH FILE" in observation:
-                patterns.append("wrong_package_name")
-            elif "NETWORK" in observation or "TIMEOUT" in observation:
-                patterns.append("network_issues")
+            # First matching category wins, in priority order
+            label = min(
+                (match.lastgroup for match in _FAILURE_CATEGORY_RE.finditer(observation)),
+                key=_FAILURE_CATEGORY_PRIORITY.__getitem__,
+                default=None
+            )
+            if label:
+                patterns.add(label)
             elif action.get("tool_name") == "execute_shell" and "pip" in str(action.get("parameters", {})):
-                if "ERROR" in observation:
-                    patterns.append("pip_failed")
+                if _ERROR_KEYWORD_RE.search(observation):
+                    patterns.add("pip_failed")
+
+            # Every category already seen; remaining turns cannot add anything
+            if len(patterns) == FAILURE_CATEGORY_COUNT:
+                break
 
-        return list(set(patterns))  # Remove duplicates
+        return list(patterns)
 
@@ -4,23 +4,24 @@ import csv
 input_file = 'abc.csv'
 output_file = 'cleaned_abc.csv'
 
-with open(input_file, 'r', newline='') as csvfile:
-    reader = csv.reader(csvfile)
-    rows = list(reader)
 
-cleaned_rows = []
-for row in rows:
-    # Fix rows with missing quotes
-    if len(row) > 4:
-        row = [','.join(row[:-3]), row[-3], row[-2], row[-1]]
-    # Fix rows with semicolon delimiter
-    if ';' in row[0]:
-        row = row[0].split(';')
-    # Fix non-numeric age
-    if not row[2].isdigit():
+def clean_row(row):
+    # Fix rows with missing quotes: extra fields belong to the first column
+    first = ','.join(row[:-3]) if len(row) > 4 else row[0]
+    # Fix rows with semicolon delimiter; the repaired row is built only once
+    if ';' in first:
+        row = first.split(';')
+    elif len(row) > 4:
+        row = [first, row[-3], row[-2], row[-1]]
+    # Fix non-numeric age (ASCII digits only; isascii is an O(1) flag check)
+    age = row[2]
+    if not (age.isascii() and age.isdigit()):
         row[2] = ''
-    cleaned_rows.append(row)
+    return row
 
-with open(output_file, 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerows(cleaned_rows)
+
+# Stream rows straight from input to output so memory use stays flat for large files
+with open(input_file, 'r', newline='', buffering=1 << 20) as infile, \
+        open(output_file, 'w', newline='', buffering=1 << 20) as outfile:
+    # Rows go through clean_row one at a time; no list of rows is ever built
+    csv.writer(outfile).writerows(map(clean_row, csv.reader(infile)))
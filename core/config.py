@@ -5,7 +5,7 @@ This file contains all configurable parameters that can be easily modified.
 """
 
 import os
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 
 class UFFlowConfig:
     """Centralized configuration class for UFFlow system."""
@@ -24,6 +24,23 @@ class UFFlowConfig:
     # DEFAULT_LLM_MODEL_JSON = "gpt-4-turbo"
     # DEFAULT_LLM_MODEL_TEXT = "gpt-4"
     
+    # Resolved settings, read from the environment once per process (see reload)
+    _resolved: Dict[Any, Any] = {}
+
+    @classmethod
+    def _resolve(cls, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return a cached setting, computing it on first use."""
+        try:
+            return cls._resolved[key]
+        except KeyError:
+            value = cls._resolved[key] = compute()
+            return value
+
+    @classmethod
+    def reload(cls) -> None:
+        """Forget resolved settings so the next getter call re-reads the environment."""
+        cls._resolved.clear()
+
     # Environment variable override
     @classmethod
     def get_llm_model(cls, model_type: str = "default") -> str:
@@ -36,6 +53,11 @@ class UFFlowConfig:
         Returns:
             Model name string
         """
+        return cls._resolve(("llm_model", model_type), lambda: cls._read_llm_model(model_type))
+
+    @classmethod
+    def _read_llm_model(cls, model_type: str) -> str:
+        """Read the LLM model name from the environment or class defaults."""
         # Check for environment variable override
         env_model = os.environ.get("UFFLOW_LLM_MODEL")
         if env_model:
@@ -55,6 +77,7 @@ class UFFlowConfig:
     DEFAULT_MAX_TOKENS_TEXT = 1000
     DEFAULT_TIMEOUT = 60.0
     DEFAULT_MAX_RETRIES = 2
+    DEFAULT_LLM_CACHE_SIZE = 256  # Cached text completions for callers that opt in (0 disables)
     
     # ReAct Configuration
     DEFAULT_MAX_TURNS = 10
@@ -65,29 +88,34 @@ class UFFlowConfig:
     @classmethod
     def get_temperature(cls) -> float:
         """Get temperature setting with environment variable override."""
-        return float(os.environ.get("UFFLOW_TEMPERATURE", cls.DEFAULT_TEMPERATURE))
+        return cls._resolve("temperature", lambda: float(os.environ.get("UFFLOW_TEMPERATURE", cls.DEFAULT_TEMPERATURE)))
     
     @classmethod
     def get_max_tokens(cls, model_type: str = "default") -> int:
         """Get max tokens setting with environment variable override."""
         if model_type == "text":
-            return int(os.environ.get("UFFLOW_MAX_TOKENS_TEXT", cls.DEFAULT_MAX_TOKENS_TEXT))
-        return int(os.environ.get("UFFLOW_MAX_TOKENS", cls.DEFAULT_MAX_TOKENS))
+            return cls._resolve("max_tokens_text", lambda: int(os.environ.get("UFFLOW_MAX_TOKENS_TEXT", cls.DEFAULT_MAX_TOKENS_TEXT)))
+        return cls._resolve("max_tokens", lambda: int(os.environ.get("UFFLOW_MAX_TOKENS", cls.DEFAULT_MAX_TOKENS)))
     
     @classmethod
     def get_timeout(cls) -> float:
         """Get timeout setting with environment variable override."""
-        return float(os.environ.get("UFFLOW_TIMEOUT", cls.DEFAULT_TIMEOUT))
+        return cls._resolve("timeout", lambda: float(os.environ.get("UFFLOW_TIMEOUT", cls.DEFAULT_TIMEOUT)))
     
     @classmethod
     def get_max_retries(cls) -> int:
         """Get max retries setting with environment variable override."""
-        return int(os.environ.get("UFFLOW_MAX_RETRIES", cls.DEFAULT_MAX_RETRIES))
+        return cls._resolve("max_retries", lambda: int(os.environ.get("UFFLOW_MAX_RETRIES", cls.DEFAULT_MAX_RETRIES)))
+    
+    @classmethod
+    def get_llm_cache_size(cls) -> int:
+        """Get LLM response cache size with environment variable override."""
+        return cls._resolve("llm_cache_size", lambda: int(os.environ.get("UFFLOW_LLM_CACHE_SIZE", cls.DEFAULT_LLM_CACHE_SIZE)))
     
     @classmethod
     def get_max_turns(cls) -> int:
         """Get max turns for ReAct with environment variable override."""
-        return int(os.environ.get("UFFLOW_MAX_TURNS", cls.DEFAULT_MAX_TURNS))
+        return cls._resolve("max_turns", lambda: int(os.environ.get("UFFLOW_MAX_TURNS", cls.DEFAULT_MAX_TURNS)))
 
 
 # Global config instance
@@ -2,13 +2,16 @@
 
 import os
 import time
-from typing import List, Optional, Dict, Any
+import json
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Callable
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from openai import OpenAI
+from openai import OpenAI, BadRequestError
 
 from core.logging_config import get_logger
 from core.config import config
@@ -37,6 +40,7 @@ class OpenAIClientManager:
         if not self._initialized:
             self.client: Optional[OpenAI] = None
             self._api_key = os.environ.get("OPENAI_API_KEY")
+            self._response_cache: "OrderedDict[str, str]" = OrderedDict()
             self._initialize_client()
             self._initialized = True
 
@@ -62,6 +66,32 @@ class OpenAIClientManager:
             self._initialize_client()
         return self.client
 
+    def _response_cache_key(self, model: str, messages: List[Dict[str, str]], tools: Optional[List]) -> str:
+        """Build a stable cache key from the model and the full request payload."""
+        payload = json.dumps({"model": model, "messages": messages, "tools": tools}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        """Return a cached completion and mark it as recently used."""
+        content = self._response_cache.get(key)
+        if content is not None:
+            self._response_cache.move_to_end(key)
+        return content
+
+    def _store_cached_response(self, key: str, content: str) -> None:
+        """Store a completion, evicting the least recently used entries past the size limit."""
+        max_size = config.get_llm_cache_size()
+        if max_size <= 0:
+            return
+        self._response_cache[key] = content
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > max_size:
+            self._response_cache.popitem(last=False)
+
+    def clear_response_cache(self) -> None:
+        """Drop all cached completions."""
+        self._response_cache.clear()
+
     def create_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         """Create a completion with retry logic and error handling."""
         client = self.get_client()
@@ -94,13 +124,25 @@ class OpenAIClientManager:
             logger.error(f"OpenAI API call failed: {e}")
             raise LLMError(f"API call failed: {e}", "api_call")
 
-    def create_completion_text(self, messages: List[Dict[str, str]], tools: Optional[List] = None, model: Optional[str] = None) -> str:
-        """Create a text completion for ReAct with optional function calling."""
+    def create_completion_text(self, messages: List[Dict[str, str]], tools: Optional[List] = None, model: Optional[str] = None, use_cache: bool = False) -> str:
+        """
+        Create a text completion for ReAct with optional function calling.
+
+        Sampled completions differ between identical requests, so only callers that pass
+        use_cache=True have responses replayed from the in-process cache.
+        """
         client = self.get_client()
 
         if model is None:
             model = config.get_llm_model("text")
 
+        # Identical requests (same model, messages and tools) are answered from cache
+        cache_key = self._response_cache_key(model, messages, tools) if use_cache else None
+        cached = self._get_cached_response(cache_key) if use_cache else None
+        if cached is not None:
+            logger.info(f"Using cached OpenAI response for model: {model}")
+            return cached
+
         try:
             logger.info(f"Making OpenAI API call with model: {model}")
             start_time = time.time()
@@ -127,21 +169,99 @@ class OpenAIClientManager:
             # Handle function calling response
             if message.tool_calls:
                 # Return structured function call data
-                import json
                 tool_call = message.tool_calls[0]
-                return json.dumps({
+                content = json.dumps({
                     "function_name": tool_call.function.name,
                     "arguments": json.loads(tool_call.function.arguments),
                     "thought": message.content or "Function call requested"
                 })
+                if use_cache:
+                    self._store_cached_response(cache_key, content)
+                return content
 
             # Handle regular text response
             content = message.content
             if not content:
                 raise LLMError("Empty response from OpenAI API", "api_response")
 
+            if use_cache:
+                self._store_cached_response(cache_key, content)
             return content
 
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
-            raise LLMError(f"API call failed: {e}", "api_call")
\ No newline at end of file
+            raise LLMError(f"API call failed: {e}", "api_call")
+
+    def create_completion_text_streamed(self, messages: List[Dict[str, str]], stop_when: Optional[Callable[[str], bool]] = None, model: Optional[str] = None, use_cache: bool = False) -> str:
+        """
+        Stream a text completion, closing the stream early once stop_when(accumulated_text) is true.
+
+        Callers that only need a prefix of the response (e.g. up to a ReAct Action line) avoid
+        waiting for the rest of the generation. Falls back to create_completion_text if the
+        provider rejects streaming. Caching follows create_completion_text's use_cache opt-in.
+        """
+        client = self.get_client()
+
+        if model is None:
+            model = config.get_llm_model("text")
+
+        cache_key = self._response_cache_key(model, messages, None) if use_cache else None
+        cached = self._get_cached_response(cache_key) if use_cache else None
+        if cached is not None:
+            logger.info(f"Using cached OpenAI response for model: {model}")
+            return cached
+
+        logger.info(f"Making streaming OpenAI API call with model: {model}")
+        start_time = time.time()
+
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=config.get_temperature(),
+                max_tokens=config.get_max_tokens("text"),
+                stream=True
+            )
+        except BadRequestError as e:
+            # Only a rejection of streaming itself is worth retrying without it; auth, quota
+            # and bad-model errors would fail the same way again
+            if "stream" not in str(e).lower():
+                logger.error(f"OpenAI API call failed: {e}")
+                raise LLMError(f"API call failed: {e}", "api_call")
+            logger.warning(f"Streaming completion unavailable, falling back to a regular call: {e}")
+            return self.create_completion_text(messages, model=model, use_cache=use_cache)
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {e}")
+            raise LLMError(f"API call failed: {e}", "api_call")
+
+        content = ""
+        stopped_early = False
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                if stop_when and stop_when(content):
+                    stopped_early = True
+                    break
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {e}")
+            raise LLMError(f"API call failed: {e}", "api_call")
+        finally:
+            # Closing the stream drops the HTTP connection so the server stops generating
+            stream.close()
+
+        duration = time.time() - start_time
+        logger.info(f"OpenAI streaming call completed in {duration:.2f}s{' (stopped early)' if stopped_early else ''}")
+
+        if not content:
+            raise LLMError("Empty response from OpenAI API", "api_response")
+
+        # A stream cut short by stop_when is only a prefix; caching it under the full
+        # request's key would hand it to later create_completion_text callers
+        if use_cache and not stopped_early:
+            self._store_cached_response(cache_key, content)
+        return content
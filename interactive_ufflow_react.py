@@ -14,11 +14,17 @@ Usage:
 
 import sys
 import os
+import re
 import json
 import argparse
 from typing import Dict, Any
 from datetime import datetime
 import shutil
+import signal
+try:
+    import readline  # Line editing and tab completion for prompts (not available on Windows)
+except ImportError:
+    readline = None
 
 # Add UFFLOW to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -33,6 +39,100 @@ from reactor.models import ReActResult
 
 # Initialize logger
 logger = get_logger('interactive_ufflow_react')
+
+# Predefined goals offered by the 'template' command; built once at import
+GOAL_TEMPLATES = {
+    "1": {
+        "name": "File Operations",
+        "description": "Create a file named 'hello.txt' with content 'Hello, ReAct World!' and then read it back to verify",
+        "constraints": {}
+    },
+    "2": {
+        "name": "Log Analysis",
+        "description": "search for all ERROR lines in log file and extract the log line that would be emitted by code and then search for all places in code where that line is emitted",
+        "constraints": {
+            "log_file": "/path/to/your/logfile.log",
+            "code_directory": "/path/to/your/source/code",
+            "file_extensions": [".java", ".js", ".py", ".ts", ".go"],
+            "output_format": "json"
+        }
+    },
+    "3": {
+        "name": "Code Analysis",
+        "description": "analyze source code files, identify patterns, and generate a summary report with findings",
+        "constraints": {
+            "source_directory": "/path/to/source/code",
+            "analysis_type": "complexity",
+            "output_format": "markdown"
+        }
+    },
+    "4": {
+        "name": "Data Processing",
+        "description": "process data files, transform content, and generate output with validation",
+        "constraints": {
+            "input_file": "/path/to/input/data.csv",
+            "output_file": "/path/to/output/result.json",
+            "transformation_type": "csv_to_json"
+        }
+    }
+}
+
+# Commands accepted at the react> prompt, offered for tab completion
+MENU_COMMANDS = ('create', 'template', 'execute', 'explore', 'save', 'history', 'status', 'help', 'quit', 'exit')
+
+QUIT_COMMANDS = frozenset(('quit', 'exit', 'q'))
+
+def _complete_menu_command(text, state):
+    """readline completer for react> commands."""
+    matches = [command for command in MENU_COMMANDS if command.startswith(text.lower())]
+    return matches[state] if state < len(matches) else None
+
+# Flat JSON objects and shell stdout inside observations, for display formatting
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]*\}')
+_STDOUT_RE = re.compile(r'stdout:\s*([^|]+)')
+
+# Terminal width shared by all instances; measured once and refreshed on resize
+_terminal_width = None
+
+def _refresh_terminal_width(*_):
+    """Re-measure the terminal width (also the SIGWINCH handler)."""
+    global _terminal_width
+    _terminal_width = shutil.get_terminal_size().columns
+
+def _get_terminal_width():
+    """Cached terminal width, measured on first use."""
+    if _terminal_width is None:
+        _refresh_terminal_width()
+        if hasattr(signal, 'SIGWINCH'):  # Not available on Windows
+            try:
+                signal.signal(signal.SIGWINCH, _refresh_terminal_width)
+            except ValueError:
+                pass  # Handlers can only be installed from the main thread
+    return _terminal_width
+
+# Layout of one execution in the history view; colors are passed in so they can be disabled
+_HISTORY_ENTRY_TEMPLATE = (
+    "\n{bold}{index}. {goal_id}{reset}\n"
+    "   Description: {description}\n"
+    "   Framework: {framework}\n"
+    "   Status: {status}\n"
+    "   Turns: {turns}\n"
+    "   Goal Achieved: {goal_achieved}\n"
+    "   Timestamp: {timestamp}"
+)
+
+def _truncate_text(text, limit):
+    """Shorten text to about `limit` characters at a word boundary; short text is returned as is."""
+    if len(text) <= limit:
+        return text
+    end = text.rfind(' ', 0, limit)
+    return text[:end if end > 0 else limit] + '...'
+
+def _write_lines(lines):
+    """Write a block of display lines to stdout with a single write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 # Terminal colors for output formatting
 class Colors:
     """ANSI color codes for terminal output."""
@@ -46,6 +146,16 @@ class Colors:
     MAGENTA = '\033[35m'
     CYAN = '\033[36m'
     WHITE = '\033[37m'
+    # Precomposed styles for section headers
+    BOLD_CYAN = BOLD + CYAN
+    BOLD_BLUE = BOLD + BLUE
+    BOLD_GREEN = BOLD + GREEN
+
+def _disable_colors():
+    """Blank out every ANSI code in Colors, for output that is not a terminal."""
+    for name in list(vars(Colors)):
+        if name.isupper():
+            setattr(Colors, name, '')
 
 class InteractiveUFFLOWReact:
     """Interactive UFFLOW React framework with goal creation and execution."""
@@ -56,8 +166,25 @@ class InteractiveUFFLOWReact:
         self.current_goal = None
         self.current_execution = None
         self.execution_history = []
-        self.terminal_width = shutil.get_terminal_size().columns
         self.fast_mode = fast_mode
+        self._main_menu_lines = None  # Built on first display
+        # react> command dispatch table (quit/exit are handled by the loop itself)
+        self._command_handlers = {
+            'help': self.display_main_menu,
+            'h': self.display_main_menu,
+            'create': self._create_goal_command,
+            'template': self._template_goal_command,
+            'execute': self._execute_command,
+            'explore': self._explore_command,
+            'save': self._save_command,
+            'history': self.display_history,
+            'status': self.display_status
+        }
+
+    @property
+    def terminal_width(self):
+        """Current terminal width in columns."""
+        return _get_terminal_width()
 
     def setup_ufflow(self):
         """Setup UFFLOW environment."""
@@ -112,7 +239,7 @@ class InteractiveUFFLOWReact:
 
     def create_goal_interactive(self):
         """Create a goal interactively."""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ CREATE NEW GOAL ═══{Colors.RESET}")
+        print(f"\n{Colors.BOLD_CYAN}═══ CREATE NEW GOAL ═══{Colors.RESET}")
 
         # Get goal description
         print(f"\n{Colors.YELLOW}Enter your goal description:{Colors.RESET}")
@@ -169,53 +296,17 @@ class InteractiveUFFLOWReact:
 
     def create_goal_from_template(self):
         """Create a goal from predefined templates."""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ GOAL TEMPLATES ═══{Colors.RESET}")
-
-        templates = {
-            "1": {
-                "name": "File Operations",
-                "description": "Create a file named 'hello.txt' with content 'Hello, ReAct World!' and then read it back to verify",
-                "constraints": {}
-            },
-            "2": {
-                "name": "Log Analysis",
-                "description": "search for all ERROR lines in log file and extract the log line that would be emitted by code and then search for all places in code where that line is emitted",
-                "constraints": {
-                    "log_file": "/path/to/your/logfile.log",
-                    "code_directory": "/path/to/your/source/code",
-                    "file_extensions": [".java", ".js", ".py", ".ts", ".go"],
-                    "output_format": "json"
-                }
-            },
-            "3": {
-                "name": "Code Analysis",
-                "description": "analyze source code files, identify patterns, and generate a summary report with findings",
-                "constraints": {
-                    "source_directory": "/path/to/source/code",
-                    "analysis_type": "complexity",
-                    "output_format": "markdown"
-                }
-            },
-            "4": {
-                "name": "Data Processing",
-                "description": "process data files, transform content, and generate output with validation",
-                "constraints": {
-                    "input_file": "/path/to/input/data.csv",
-                    "output_file": "/path/to/output/result.json",
-                    "transformation_type": "csv_to_json"
-                }
-            }
-        }
+        print(f"\n{Colors.BOLD_CYAN}═══ GOAL TEMPLATES ═══{Colors.RESET}")
 
         print(f"\n{Colors.YELLOW}Available templates:{Colors.RESET}")
-        for key, template in templates.items():
+        for key, template in GOAL_TEMPLATES.items():
             print(f"  {key}. {template['name']}")
-            print(f"     {Colors.DIM}{template['description'][:80]}...{Colors.RESET}")
+            print(f"     {Colors.DIM}{_truncate_text(template['description'], 80)}{Colors.RESET}")
 
         choice = input(f"\n{Colors.CYAN}Select template (1-4) or 'custom' for custom goal: {Colors.RESET}").strip()
 
-        if choice in templates:
-            template = templates[choice]
+        if choice in GOAL_TEMPLATES:
+            template = GOAL_TEMPLATES[choice]
             print(f"\n{Colors.GREEN}Selected template: {template['name']}{Colors.RESET}")
 
             # Allow customization
@@ -253,7 +344,7 @@ class InteractiveUFFLOWReact:
 
     def execute_goal_react(self, goal: Goal, max_turns: int = 10):
         """Execute a goal using ReAct framework with live updates."""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ EXECUTING GOAL (REACT) ═══{Colors.RESET}")
+        print(f"\n{Colors.BOLD_CYAN}═══ EXECUTING GOAL (REACT) ═══{Colors.RESET}")
         print(f"{Colors.BOLD}Goal ID:{Colors.RESET} {goal.id}")
         print(f"{Colors.BOLD}Description:{Colors.RESET} {goal.description}")
         print(f"{Colors.BOLD}Max Turns:{Colors.RESET} {max_turns}")
@@ -305,7 +396,7 @@ class InteractiveUFFLOWReact:
         # Initialize state
         state = ReActState(goal=goal.description, max_turns=max_turns)
 
-        print(f"\n{Colors.BOLD}{Colors.BLUE}═══ LIVE REACT EXECUTION ═══{Colors.RESET}")
+        print(f"\n{Colors.BOLD_BLUE}═══ LIVE REACT EXECUTION ═══{Colors.RESET}")
 
         # Get available tools
         available_tools = self.registry.list_ufs()
@@ -322,7 +413,7 @@ class InteractiveUFFLOWReact:
                     break
                 # If Y, yes, or Enter (empty), continue
 
-            print(f"\n{Colors.BOLD}{Colors.CYAN}┌─ Turn {turn_num}/{state.max_turns}+ ─────────────────────────────────────────────────┐{Colors.RESET}" if turn_num > state.max_turns else f"\n{Colors.BOLD}{Colors.CYAN}┌─ Turn {turn_num}/{state.max_turns} ─────────────────────────────────────────────────┐{Colors.RESET}")
+            print(f"\n{Colors.BOLD_CYAN}┌─ Turn {turn_num}/{state.max_turns}+ ─────────────────────────────────────────────────┐{Colors.RESET}" if turn_num > state.max_turns else f"\n{Colors.BOLD_CYAN}┌─ Turn {turn_num}/{state.max_turns} ─────────────────────────────────────────────────┐{Colors.RESET}")
             print(f"{Colors.BOLD}│ {Colors.YELLOW}**Reasoning...**{Colors.RESET}{Colors.BOLD}                                      │{Colors.RESET}")
             print(f"{Colors.BOLD}└───────────────────────────────────────────────────────────┘{Colors.RESET}")
 
@@ -340,7 +431,7 @@ class InteractiveUFFLOWReact:
                     if wm.new_facts:
                         print(f"{Colors.CYAN}🧠 {Colors.BOLD}**New Facts:**{Colors.RESET} {', '.join(wm.new_facts[:2])}{'...' if len(wm.new_facts) > 2 else ''}")
                     if wm.updated_hypothesis:
-                        print(f"{Colors.CYAN}💡 {Colors.BOLD}**Hypothesis:**{Colors.RESET} {wm.updated_hypothesis[:100]}...")
+                        print(f"{Colors.CYAN}💡 {Colors.BOLD}**Hypothesis:**{Colors.RESET} {_truncate_text(wm.updated_hypothesis, 100)}")
                 if parsed_response.progress_check:
                     print(f"{Colors.MAGENTA}📊 {Colors.BOLD}**Progress Check:**{Colors.RESET} {parsed_response.progress_check}")
                 print(f"{Colors.YELLOW}💭 {Colors.BOLD}**Thought:**{Colors.RESET} {parsed_response.thought}")
@@ -368,7 +459,7 @@ class InteractiveUFFLOWReact:
                     break
 
                 # Execute action
-                print(f"{Colors.CYAN}{Colors.BOLD}**Executing Action:**{Colors.RESET} {Colors.DIM}{parsed_response.action.get('tool_name', 'unknown')} with parameters {parsed_response.action.get('parameters', {})}{Colors.RESET}")
+                print(f"{Colors.BOLD_CYAN}**Executing Action:**{Colors.RESET} {Colors.DIM}{parsed_response.action.get('tool_name', 'unknown')} with parameters {parsed_response.action.get('parameters', {})}{Colors.RESET}")
                 observation = self.agent_controller.tool_executor.execute_action(parsed_response.action)
 
                 # Display observation
@@ -410,26 +501,26 @@ class InteractiveUFFLOWReact:
 
     def _display_react_summary(self, result: ReActResult):
         """Display ReAct execution summary."""
-        print(f"\n{Colors.BOLD}{Colors.GREEN}═══ REACT EXECUTION SUMMARY ═══{Colors.RESET}")
+        lines = [f"\n{Colors.BOLD_GREEN}═══ REACT EXECUTION SUMMARY ═══{Colors.RESET}"]
 
         state = result.state
 
         # Basic info
-        print(f"{Colors.BOLD}Success:{Colors.RESET} {Colors.GREEN if result.success else Colors.RED}{result.success}{Colors.RESET}")
-        print(f"{Colors.BOLD}Total Turns:{Colors.RESET} {state.turn_count}")
-        print(f"{Colors.BOLD}Goal Achieved:{Colors.RESET} {Colors.GREEN if state.is_complete else Colors.RED}{state.is_complete}{Colors.RESET}")
+        lines.append(f"{Colors.BOLD}Success:{Colors.RESET} {Colors.GREEN if result.success else Colors.RED}{result.success}{Colors.RESET}")
+        lines.append(f"{Colors.BOLD}Total Turns:{Colors.RESET} {state.turn_count}")
+        lines.append(f"{Colors.BOLD}Goal Achieved:{Colors.RESET} {Colors.GREEN if state.is_complete else Colors.RED}{state.is_complete}{Colors.RESET}")
 
         if state.completion_reason:
-            print(f"{Colors.BOLD}Completion Reason:{Colors.RESET} {state.completion_reason}")
+            lines.append(f"{Colors.BOLD}Completion Reason:{Colors.RESET} {state.completion_reason}")
 
         # Execution duration
         if state.end_time and state.start_time:
             duration = state.end_time - state.start_time
-            print(f"{Colors.BOLD}Duration:{Colors.RESET} {duration.total_seconds():.2f}s")
+            lines.append(f"{Colors.BOLD}Duration:{Colors.RESET} {duration.total_seconds():.2f}s")
 
         # Show turn-by-turn summary
         if state.scratchpad:
-            print(f"\n{Colors.BOLD}Turn Summary:{Colors.RESET}")
+            lines.append(f"\n{Colors.BOLD}Turn Summary:{Colors.RESET}")
             actions_used = []
             for entry in state.scratchpad:
                 tool_name = entry.action.get('tool_name', 'unknown')
@@ -443,41 +534,34 @@ class InteractiveUFFLOWReact:
                     status_icon = "✅" if not entry.observation.startswith("ERROR") else "❌"
                     display_name = tool_name
 
-                print(f"  {status_icon} Turn {entry.turn}: {display_name}")
+                lines.append(f"  {status_icon} Turn {entry.turn}: {display_name}")
 
             # Show unique tools used (excluding 'finish')
             unique_tools = list(set([t for t in actions_used if t != 'finish']))
             if unique_tools:
-                print(f"\n{Colors.BOLD}Tools Used:{Colors.RESET} {', '.join(unique_tools)}")
+                lines.append(f"\n{Colors.BOLD}Tools Used:{Colors.RESET} {', '.join(unique_tools)}")
 
-        print(f"\n{Colors.BOLD}Summary:{Colors.RESET} {result.execution_summary}")
+        lines.append(f"\n{Colors.BOLD}Summary:{Colors.RESET} {result.execution_summary}")
+        _write_lines(lines)
 
     def _format_observation_output(self, observation: str) -> str:
         """Format observation output with proper code/JSON formatting."""
         try:
-            # Check if observation contains JSON
-            import re
-            json_pattern = r'\{[^{}]*\}'
-            json_matches = re.findall(json_pattern, observation)
-
-            formatted_obs = observation
-
-            # Format JSON objects
-            for json_match in json_matches:
+            def format_json(match):
                 try:
-                    import json
-                    parsed = json.loads(json_match)
-                    pretty_json = json.dumps(parsed, indent=2)
-                    # Add code block formatting
-                    formatted_json = f"\n```json\n{pretty_json}\n```"
-                    formatted_obs = formatted_obs.replace(json_match, formatted_json)
+                    parsed = json.loads(match.group(0))
                 except json.JSONDecodeError:
-                    continue
+                    return match.group(0)
+                # Add code block formatting
+                return f"\n```json\n{json.dumps(parsed, indent=2)}\n```"
+
+            # Format JSON objects in a single pass instead of one full-string replace per object
+            formatted_obs = _JSON_OBJECT_RE.sub(format_json, observation)
 
             # Check if observation contains code output (shell commands, etc.)
             if 'stdout:' in observation:
                 # Extract stdout content and format it
-                stdout_match = re.search(r'stdout:\s*([^|]+)', observation)
+                stdout_match = _STDOUT_RE.search(observation)
                 if stdout_match:
                     stdout_content = stdout_match.group(1).strip()
                     # Check if it looks like code or structured output
@@ -502,6 +586,10 @@ class InteractiveUFFLOWReact:
         # Convert scratchpad to plan-like structure for CLI compatibility
         nodes = {}
         graph = {}
+        # Summary totals, accumulated while building the nodes; successes are tracked by
+        # node id since a repeated turn number overwrites its earlier node
+        successful_node_ids = set()
+        total_duration_ms = 0
 
         for i, entry in enumerate(state.scratchpad):
             node_id = f"turn-{entry.turn}"
@@ -509,6 +597,11 @@ class InteractiveUFFLOWReact:
 
             # Create a mock result for CLI display
             success = not entry.observation.startswith("ERROR")
+            if success:
+                successful_node_ids.add(node_id)
+            else:
+                successful_node_ids.discard(node_id)
+            total_duration_ms += entry.duration_ms or 0
             mock_result = {
                 "status": "success" if success else "failure",
                 "output": entry.observation,
@@ -555,10 +648,10 @@ class InteractiveUFFLOWReact:
             },
             "execution_summary": {
                 "total_nodes": len(nodes),
-                "successful_nodes": sum(1 for node in nodes.values() if node['status'] == 'success'),
-                "failed_nodes": sum(1 for node in nodes.values() if node['status'] == 'failure'),
+                "successful_nodes": len(successful_node_ids),
+                "failed_nodes": len(nodes) - len(successful_node_ids),
                 "total_cost": 0.0,  # ReAct doesn't track detailed costs yet
-                "total_duration_ms": sum(entry.duration_ms or 0 for entry in state.scratchpad),
+                "total_duration_ms": total_duration_ms,
                 "final_status": "succeeded" if result.success else "failed",
                 "framework": "ReAct",
                 "turns_taken": state.turn_count,
@@ -574,10 +667,10 @@ class InteractiveUFFLOWReact:
             filename = f"ufflow_react_execution_{timestamp}.json"
 
         try:
-            import json
-            from core.workspace_security import secure_write_text
-            content = json.dumps(execution_data, indent=2, default=str)
-            secure_write_text(filename, content)
+            from core.workspace_security import secure_open
+            # Serialize straight into the file rather than building the whole JSON string first
+            with secure_open(filename, 'w') as f:
+                json.dump(execution_data, f, indent=2, default=str)
             print(f"{Colors.GREEN}✅ Execution saved to {filename}{Colors.RESET}")
             return filename
         except Exception as e:
@@ -586,7 +679,7 @@ class InteractiveUFFLOWReact:
 
     def explore_execution(self, execution_data: Dict[str, Any]):
         """Display execution summary (simplified exploration)."""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ EXECUTION SUMMARY ═══{Colors.RESET}")
+        print(f"\n{Colors.BOLD_CYAN}═══ EXECUTION SUMMARY ═══{Colors.RESET}")
 
         # Show basic summary info
         if 'execution_summary' in execution_data:
@@ -735,49 +828,62 @@ class InteractiveUFFLOWReact:
 
     def display_main_menu(self):
         """Display the main interactive menu."""
+        # The menu only depends on fast_mode, so build it once and redraw the cached lines
+        if self._main_menu_lines is None:
+            self._main_menu_lines = self._build_main_menu()
+        _write_lines(self._main_menu_lines)
+
+    def _build_main_menu(self):
+        """Lines of the main interactive menu."""
         mode_indicator = " - FAST MODE" if self.fast_mode else ""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}╔══════════════════════════════════════════════════════════════════════════════╗")
-        print(f"║                   INTERACTIVE REACT FRAMEWORK{mode_indicator:<20} ║")
-        print(f"║                      Create, Execute, and Explore Goals                    ║")
-        print(f"╚══════════════════════════════════════════════════════════════════════════════╝{Colors.RESET}")
-
-        print(f"\n{Colors.GREEN}Available Commands:{Colors.RESET}")
-        print(f"  {Colors.BOLD}create{Colors.RESET}     - Create a new goal (custom)")
-        print(f"  {Colors.BOLD}template{Colors.RESET}   - Create goal from template")
-        print(f"  {Colors.BOLD}execute{Colors.RESET}    - Execute current goal with ReAct framework")
-        print(f"  {Colors.BOLD}explore{Colors.RESET}    - Show summary of last execution")
-        print(f"  {Colors.BOLD}save{Colors.RESET}       - Save last execution to file")
-        print(f"  {Colors.BOLD}history{Colors.RESET}    - Show execution history")
-        print(f"  {Colors.BOLD}status{Colors.RESET}     - Show current status")
-        print(f"  {Colors.BOLD}help{Colors.RESET}       - Show this help")
-        print(f"  {Colors.BOLD}quit{Colors.RESET}       - Exit")
+        lines = [
+            f"\n{Colors.BOLD_CYAN}╔══════════════════════════════════════════════════════════════════════════════╗",
+            f"║                   INTERACTIVE REACT FRAMEWORK{mode_indicator:<20} ║",
+            f"║                      Create, Execute, and Explore Goals                    ║",
+            f"╚══════════════════════════════════════════════════════════════════════════════╝{Colors.RESET}",
+            f"\n{Colors.GREEN}Available Commands:{Colors.RESET}",
+            f"  {Colors.BOLD}create{Colors.RESET}     - Create a new goal (custom)",
+            f"  {Colors.BOLD}template{Colors.RESET}   - Create goal from template",
+            f"  {Colors.BOLD}execute{Colors.RESET}    - Execute current goal with ReAct framework",
+            f"  {Colors.BOLD}explore{Colors.RESET}    - Show summary of last execution",
+            f"  {Colors.BOLD}save{Colors.RESET}       - Save last execution to file",
+            f"  {Colors.BOLD}history{Colors.RESET}    - Show execution history",
+            f"  {Colors.BOLD}status{Colors.RESET}     - Show current status",
+            f"  {Colors.BOLD}help{Colors.RESET}       - Show this help",
+            f"  {Colors.BOLD}quit{Colors.RESET}       - Exit"
+        ]
 
         if self.fast_mode:
-            print(f"\n{Colors.BLUE}💨 FAST mode features:{Colors.RESET}")
-            print(f"   • Skip constraints prompt (auto-set workspace to CWD)")
-            print(f"   • Auto-enable live reasoning")
-            print(f"   • Auto-execute after goal creation")
+            lines.extend([
+                f"\n{Colors.BLUE}💨 FAST mode features:{Colors.RESET}",
+                f"   • Skip constraints prompt (auto-set workspace to CWD)",
+                f"   • Auto-enable live reasoning",
+                f"   • Auto-execute after goal creation"
+            ])
+
+        return lines
 
     def display_status(self):
         """Display current status."""
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ CURRENT STATUS ═══{Colors.RESET}")
+        lines = [f"\n{Colors.BOLD_CYAN}═══ CURRENT STATUS ═══{Colors.RESET}"]
 
         if self.current_goal:
-            print(f"{Colors.BOLD}Current Goal:{Colors.RESET} {self.current_goal.id}")
-            print(f"{Colors.BOLD}Description:{Colors.RESET} {self.current_goal.description}")
+            lines.append(f"{Colors.BOLD}Current Goal:{Colors.RESET} {self.current_goal.id}")
+            lines.append(f"{Colors.BOLD}Description:{Colors.RESET} {self.current_goal.description}")
         else:
-            print(f"{Colors.YELLOW}No current goal{Colors.RESET}")
+            lines.append(f"{Colors.YELLOW}No current goal{Colors.RESET}")
 
         if self.current_execution:
             summary = self.current_execution.get('execution_summary', {})
-            print(f"{Colors.BOLD}Last Execution:{Colors.RESET} {summary.get('final_status', 'unknown')}")
-            print(f"{Colors.BOLD}Framework:{Colors.RESET} {summary.get('framework', 'ReAct')}")
-            print(f"{Colors.BOLD}Turns Taken:{Colors.RESET} {summary.get('turns_taken', 0)}")
-            print(f"{Colors.BOLD}Goal Achieved:{Colors.RESET} {summary.get('goal_achieved', False)}")
+            lines.append(f"{Colors.BOLD}Last Execution:{Colors.RESET} {summary.get('final_status', 'unknown')}")
+            lines.append(f"{Colors.BOLD}Framework:{Colors.RESET} {summary.get('framework', 'ReAct')}")
+            lines.append(f"{Colors.BOLD}Turns Taken:{Colors.RESET} {summary.get('turns_taken', 0)}")
+            lines.append(f"{Colors.BOLD}Goal Achieved:{Colors.RESET} {summary.get('goal_achieved', False)}")
         else:
-            print(f"{Colors.YELLOW}No executions yet{Colors.RESET}")
+            lines.append(f"{Colors.YELLOW}No executions yet{Colors.RESET}")
 
-        print(f"{Colors.BOLD}Execution History:{Colors.RESET} {len(self.execution_history)} executions")
+        lines.append(f"{Colors.BOLD}Execution History:{Colors.RESET} {len(self.execution_history)} executions")
+        _write_lines(lines)
 
     def display_history(self):
         """Display execution history."""
@@ -785,19 +891,73 @@ class InteractiveUFFLOWReact:
             print(f"{Colors.YELLOW}No execution history{Colors.RESET}")
             return
 
-        print(f"\n{Colors.BOLD}{Colors.CYAN}═══ EXECUTION HISTORY ═══{Colors.RESET}")
+        lines = [f"\n{Colors.BOLD_CYAN}═══ EXECUTION HISTORY ═══{Colors.RESET}"]
 
         for i, execution in enumerate(self.execution_history, 1):
             goal = execution.get('goal', {})
             summary = execution.get('execution_summary', {})
 
-            print(f"\n{Colors.BOLD}{i}. {goal.get('id', 'unknown')}{Colors.RESET}")
-            print(f"   Description: {goal.get('description', 'N/A')[:80]}...")
-            print(f"   Framework: {summary.get('framework', 'ReAct')}")
-            print(f"   Status: {summary.get('final_status', 'unknown')}")
-            print(f"   Turns: {summary.get('turns_taken', 0)}")
-            print(f"   Goal Achieved: {summary.get('goal_achieved', False)}")
-            print(f"   Timestamp: {summary.get('timestamp', 'N/A')}")
+            lines.append(_HISTORY_ENTRY_TEMPLATE.format(
+                bold=Colors.BOLD,
+                reset=Colors.RESET,
+                index=i,
+                goal_id=goal.get('id', 'unknown'),
+                description=_truncate_text(goal.get('description', 'N/A'), 80),
+                framework=summary.get('framework', 'ReAct'),
+                status=summary.get('final_status', 'unknown'),
+                turns=summary.get('turns_taken', 0),
+                goal_achieved=summary.get('goal_achieved', False),
+                timestamp=summary.get('timestamp', 'N/A')
+            ))
+
+        _write_lines(lines)
+
+    def _create_goal_command(self):
+        """Handle 'create': build a custom goal."""
+        self.current_goal = self.create_goal_interactive()
+
+    def _template_goal_command(self):
+        """Handle 'template': build a goal from a template."""
+        self.current_goal = self.create_goal_from_template()
+
+    def _execute_command(self):
+        """Handle 'execute': run the current goal, then offer a follow-up goal on success."""
+        if not self.current_goal:
+            print(f"{Colors.RED}❌ No current goal. Create one first.{Colors.RESET}")
+            return
+
+        # Ask for max turns
+        max_turns_input = input(f"{Colors.CYAN}Max turns (default 10): {Colors.RESET}").strip()
+        try:
+            max_turns = int(max_turns_input) if max_turns_input else 10
+        except ValueError:
+            max_turns = 10
+
+        self.current_execution = self.execute_goal_react(self.current_goal, max_turns)
+
+        # Check if goal was completed and prompt for next goal
+        if self.current_execution:
+            summary = self.current_execution.get('execution_summary', {})
+            if summary.get('goal_achieved', False):
+                self._prompt_for_next_goal()
+
+    def _explore_command(self):
+        """Handle 'explore': summarize the last execution."""
+        if not self.current_execution:
+            print(f"{Colors.RED}❌ No execution to explore. Execute a goal first.{Colors.RESET}")
+        else:
+            self.explore_execution(self.current_execution)
+
+    def _save_command(self):
+        """Handle 'save': write the last execution to a file."""
+        if not self.current_execution:
+            print(f"{Colors.RED}❌ No execution to save. Execute a goal first.{Colors.RESET}")
+            return
+
+        filename = input(f"{Colors.CYAN}Filename (or Enter for auto-generated): {Colors.RESET}").strip()
+        if not filename:
+            filename = None
+        self.save_execution(self.current_execution, filename)
 
     def run_interactive(self):
         """Run the interactive UFFLOW React session."""
@@ -823,6 +983,13 @@ class InteractiveUFFLOWReact:
             self._run_fast_mode_loop()
             return
 
+        if readline:
+            # macOS ships libedit, which uses its own binding syntax
+            if 'libedit' in (readline.__doc__ or ''):
+                readline.parse_and_bind('bind ^I rl_complete')
+            else:
+                readline.parse_and_bind('tab: complete')
+
         # Regular mode - Go directly to goal creation
         self.current_goal = self.create_goal_interactive()
         if self.current_goal:
@@ -835,64 +1002,25 @@ class InteractiveUFFLOWReact:
         while True:
             try:
                 self.display_main_menu()
-                command = input(f"\n{Colors.CYAN}react> {Colors.RESET}").strip().lower()
+                # Tab-complete commands at this prompt only, not in free-text goal input
+                if readline:
+                    readline.set_completer(_complete_menu_command)
+                try:
+                    command = input(f"\n{Colors.CYAN}react> {Colors.RESET}").strip().lower()
+                finally:
+                    if readline:
+                        readline.set_completer(None)
 
                 if not command:
                     continue
 
-                if command in ['quit', 'exit', 'q']:
+                if command in QUIT_COMMANDS:
                     print(f"\n{Colors.GREEN}👋 Goodbye!{Colors.RESET}")
                     break
 
-                elif command in ['help', 'h']:
-                    self.display_main_menu()
-
-                elif command == 'create':
-                    self.current_goal = self.create_goal_interactive()
-
-                elif command == 'template':
-                    self.current_goal = self.create_goal_from_template()
-
-                elif command == 'execute':
-                    if not self.current_goal:
-                        print(f"{Colors.RED}❌ No current goal. Create one first.{Colors.RESET}")
-                    else:
-                        # Ask for max turns
-                        max_turns_input = input(f"{Colors.CYAN}Max turns (default 10): {Colors.RESET}").strip()
-                        try:
-                            max_turns = int(max_turns_input) if max_turns_input else 10
-                        except ValueError:
-                            max_turns = 10
-
-                        self.current_execution = self.execute_goal_react(self.current_goal, max_turns)
-
-                        # Check if goal was completed and prompt for next goal
-                        if self.current_execution:
-                            summary = self.current_execution.get('execution_summary', {})
-                            if summary.get('goal_achieved', False):
-                                self._prompt_for_next_goal()
-
-                elif command == 'explore':
-                    if not self.current_execution:
-                        print(f"{Colors.RED}❌ No execution to explore. Execute a goal first.{Colors.RESET}")
-                    else:
-                        self.explore_execution(self.current_execution)
-
-                elif command == 'save':
-                    if not self.current_execution:
-                        print(f"{Colors.RED}❌ No execution to save. Execute a goal first.{Colors.RESET}")
-                    else:
-                        filename = input(f"{Colors.CYAN}Filename (or Enter for auto-generated): {Colors.RESET}").strip()
-                        if not filename:
-                            filename = None
-                        self.save_execution(self.current_execution, filename)
-
-                elif command == 'history':
-                    self.display_history()
-
-                elif command == 'status':
-                    self.display_status()
-
+                handler = self._command_handlers.get(command)
+                if handler:
+                    handler()
                 else:
                     print(f"{Colors.RED}❌ Unknown command: {command}{Colors.RESET}")
                     print(f"Type 'help' for available commands")
@@ -948,6 +1076,11 @@ ReAct Features:
         from core.logging_config import setup_logging
         setup_logging(suppress_info_logs=True)
 
+    # Colors is process-wide, so only the entry point decides; escape codes are
+    # just noise when output is piped or redirected
+    if not sys.stdout.isatty():
+        _disable_colors()
+
     # Create and run interactive UFFLOW React
     interactive_ufflow = InteractiveUFFLOWReact(fast_mode=args.fast)
     interactive_ufflow.run_interactive()
@@ -20,6 +20,9 @@ class ScratchpadEntry(BaseModel):
     intent: Optional[str] = Field(None, description="Agent's classified intent for this turn")
     action: Dict[str, Any] = Field(..., description="Tool action taken")
     observation: str = Field(..., description="Result of the action")
+    display_observation: Optional[str] = Field(None, description="Truncated observation for prompt history, set once at insertion")
+    status: Optional[str] = Field(None, description="Outcome prefix of the observation (e.g. SUCCESS, FAILED), set once at insertion")
+    failed: Optional[bool] = Field(None, description="Whether the observation reports an error or failure, set once at insertion")
     progress_check: Optional[str] = Field(None, description="Agent's progress assessment for this turn")
     timestamp: datetime = Field(default_factory=datetime.now)
     duration_ms: Optional[int] = None
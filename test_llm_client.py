@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the OpenAI client wrapper's response cache and streamed completions.
+"""
+
+import sys
+import os
+from types import SimpleNamespace as NS
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from openai import AuthenticationError, BadRequestError
+
+from core.config import config
+from core.llm.client import OpenAIClientManager, LLMError
+
+MESSAGES = [{"role": "user", "content": "install jq"}]
+
+class FakeStream:
+    """Minimal stand-in for an OpenAI chat completion stream."""
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield NS(choices=[NS(delta=NS(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+def _api_error(error_type, message, status_code):
+    # Only the attributes APIStatusError reads from the HTTP response
+    response = NS(status_code=status_code, request=NS(), headers={})
+    return error_type(message, response=response, body=None)
+
+@pytest.fixture
+def client(monkeypatch):
+    """A fresh client manager with a small cache and no real OpenAI client."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(OpenAIClientManager, "_instance", None)
+    monkeypatch.setattr(config, "get_llm_cache_size", lambda: 2)
+    return OpenAIClientManager()
+
+def _use_create(client, create):
+    client.client = NS(chat=NS(completions=NS(create=create)))
+
+def _plain_response(text):
+    return NS(choices=[NS(message=NS(content=text, tool_calls=None))])
+
+def test_streamed_completion_stops_early_and_closes_stream(client):
+    stream = FakeStream(["Thought: x\n", "Action: {}\n", "Observation: never read"])
+    _use_create(client, lambda **kwargs: stream)
+
+    content = client.create_completion_text_streamed(MESSAGES, stop_when=lambda text: "Action:" in text)
+
+    assert content == "Thought: x\nAction: {}\n"
+    assert stream.consumed == 2
+    assert stream.closed
+
+def test_early_stopped_stream_is_not_cached(client):
+    _use_create(client, lambda **kwargs: FakeStream(["partial ", "rest"]))
+    client.create_completion_text_streamed(MESSAGES, stop_when=lambda text: "partial" in text, use_cache=True)
+
+    _use_create(client, lambda **kwargs: _plain_response("full answer"))
+    assert client.create_completion_text(MESSAGES, use_cache=True) == "full answer"
+
+def test_complete_stream_is_cached(client):
+    calls = []
+    def create(**kwargs):
+        calls.append(kwargs)
+        return FakeStream(["full ", "answer"])
+    _use_create(client, create)
+
+    assert client.create_completion_text_streamed(MESSAGES, use_cache=True) == "full answer"
+    assert client.create_completion_text_streamed(MESSAGES, use_cache=True) == "full answer"
+    assert client.create_completion_text(MESSAGES, use_cache=True) == "full answer"
+    assert len(calls) == 1
+
+def test_cache_is_opt_in(client):
+    answers = iter(["first", "second", "third", "fourth"])
+    _use_create(client, lambda **kwargs: _plain_response(next(answers)))
+
+    assert client.create_completion_text(MESSAGES) == "first"
+    assert client.create_completion_text(MESSAGES) == "second"
+    assert client.create_completion_text(MESSAGES, use_cache=True) == "third"
+    assert client.create_completion_text(MESSAGES) == "fourth"
+
+def test_cache_evicts_least_recently_used(client):
+    calls = []
+    def create(**kwargs):
+        calls.append(kwargs["messages"][0]["content"])
+        return _plain_response(f"answer to {calls[-1]}")
+    _use_create(client, create)
+    ask = lambda text: client.create_completion_text([{"role": "user", "content": text}], use_cache=True)
+
+    ask("a")
+    ask("b")
+    ask("a")  # Hit; "b" is now the least recently used
+    ask("c")  # Over the size limit of 2, evicts "b"
+    assert calls == ["a", "b", "c"]
+
+    assert ask("a") == "answer to a"
+    assert ask("b") == "answer to b"
+    assert calls == ["a", "b", "c", "b"]
+
+def test_cache_key_is_stable(client):
+    key = client._response_cache_key("gpt-4o", [{"role": "user", "content": "x"}], None)
+
+    assert key == client._response_cache_key("gpt-4o", [{"content": "x", "role": "user"}], None)
+    assert key != client._response_cache_key("gpt-4o-mini", [{"role": "user", "content": "x"}], None)
+    assert key != client._response_cache_key("gpt-4o", [{"role": "user", "content": "y"}], None)
+    assert key != client._response_cache_key("gpt-4o", [{"role": "user", "content": "x"}], [{"type": "function"}])
+
+def test_stream_rejection_falls_back_to_regular_call(client):
+    def create(**kwargs):
+        if kwargs.get("stream"):
+            raise _api_error(BadRequestError, "Streaming is not supported for this model", 400)
+        return _plain_response("fallback answer")
+    _use_create(client, create)
+
+    assert client.create_completion_text_streamed(MESSAGES) == "fallback answer"
+
+@pytest.mark.parametrize("error", [
+    _api_error(AuthenticationError, "Incorrect API key provided", 401),
+    _api_error(BadRequestError, "The model 'gpt-nope' does not exist", 400),
+])
+def test_other_errors_do_not_fall_back(client, error):
+    calls = []
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise error
+    _use_create(client, create)
+
+    with pytest.raises(LLMError):
+        client.create_completion_text_streamed(MESSAGES)
+    assert len(calls) == 1
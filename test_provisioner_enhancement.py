@@ -5,9 +5,23 @@ Test script to verify the enhanced tool provisioner with LLM knowledge gathering
 
 import sys
 import os
+import json
+import time
+import asyncio
+import subprocess
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import pytest
+
+import agents.provisioner as provisioner
 from agents.provisioner import ToolProvisioningAgent
+from reactor.models import ReActState, ScratchpadEntry
+
+@pytest.fixture
+def offline_agent(monkeypatch):
+    """A provisioner that never needs a real API key; tests mock anything that would call the LLM."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return ToolProvisioningAgent()
 
 def test_scrubcsv_installation():
     """Test the enhanced provisioner with scrubcsv installation."""
@@ -44,5 +58,236 @@ def test_scrubcsv_installation():
 
     return result
 
+def test_probe_candidates_accepts_single_string(offline_agent):
+    observation = offline_agent._execute_probe_install_candidates_action({"commands": "python3 --version"})
+    assert observation.startswith("SUCCESS: First working candidate: python3 --version")
+    assert "results: python3 --version -> return_code 0" in observation
+
+def test_probe_candidates_reports_first_success_from_list(offline_agent):
+    observation = offline_agent._execute_probe_install_candidates_action({"commands": ["false", "true"]})
+    assert observation.startswith("SUCCESS: First working candidate: true")
+    assert "false -> return_code 1" in observation
+
+def test_probe_candidates_all_fail(offline_agent):
+    observation = offline_agent._execute_probe_install_candidates_action(
+        {"commands": ["false", "oats-no-such-probe-binary --version"]}
+    )
+    assert observation.startswith("FAILED: No candidate succeeded")
+    assert "oats-no-such-probe-binary --version -> error:" in observation
+
+def test_probe_candidates_timeout(offline_agent, monkeypatch):
+    monkeypatch.setattr(provisioner, "PROBE_TIMEOUT_SECONDS", 0.5)
+    observation = offline_agent._execute_probe_install_candidates_action({"commands": ["sleep 5"]})
+    assert observation == "ERROR: Probes timed out after 0.5 seconds"
+
+def test_probe_candidates_refuses_mutating_commands(offline_agent):
+    observation = offline_agent._execute_probe_install_candidates_action(
+        {"commands": ["brew info jq", "brew install jq", "sudo apt-cache show jq"]}
+    )
+    assert observation.startswith("ERROR: Probes must be read-only")
+    assert "brew install jq (install)" in observation
+    assert "sudo apt-cache show jq (sudo)" in observation
+    assert "brew info jq (" not in observation
+
+def test_probe_candidates_inside_running_event_loop(offline_agent):
+    async def probe_from_loop():
+        return offline_agent._execute_probe_install_candidates_action({"commands": ["true"]})
+    assert asyncio.run(probe_from_loop()).startswith("SUCCESS: First working candidate: true")
+
+def test_probe_package_managers_accepts_single_string(offline_agent):
+    observation = offline_agent._execute_probe_package_managers_action({"managers": "oats-no-such-manager"})
+    assert observation == "NOT_FOUND: No package managers available | checked: oats-no-such-manager"
+
+def test_probe_package_managers_inside_running_event_loop(offline_agent):
+    async def probe_from_loop():
+        return offline_agent._execute_probe_package_managers_action({"managers": ["python3", "oats-no-such-manager"]})
+    observation = asyncio.run(probe_from_loop())
+    assert observation.startswith("SUCCESS: Available package managers: python3 (Python 3")
+    assert observation.endswith("| missing: oats-no-such-manager")
+
+def test_bounded_output_truncates_past_limit():
+    return_code, stdout, stderr = provisioner._run_with_bounded_output("yes | head -c 200000", timeout=30, limit=1000)
+    assert return_code == 0
+    assert stdout == "y\n" * 500
+    assert stderr == ""
+
+def test_bounded_output_missing_binary_returns_127():
+    return_code, stdout, stderr = provisioner._run_with_bounded_output("oats-no-such-binary --version", timeout=30, limit=1000)
+    assert return_code == 127
+    assert "oats-no-such-binary" in stderr
+
+@pytest.mark.parametrize("command, new_session", [
+    ("sudo apt-get install -y jq", False),
+    ("apt-get update && sudo apt-get install -y jq", False),
+    ("doas pkg_add jq", False),
+    ("brew install jq", True),
+    ("pip3 install csvkit > /dev/null", True),
+])
+def test_spawn_keeps_terminal_for_privileged_commands(monkeypatch, command, new_session):
+    spawned = []
+    monkeypatch.setattr(provisioner.subprocess, "Popen", lambda args, **kwargs: spawned.append(kwargs))
+    provisioner._spawn_command(command)
+    assert spawned[0]["start_new_session"] is new_session
+
+def _process_gone(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    # A killed child reparented to an init that has not reaped it yet is a zombie
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return False
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX-only")
+def test_bounded_output_timeout_kills_child_processes(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    with pytest.raises(subprocess.TimeoutExpired):
+        provisioner._run_with_bounded_output(f"sleep 30 & echo $! > {pid_file}; wait", timeout=1, limit=1000)
+
+    child_pid = int(pid_file.read_text())
+    deadline = time.time() + 5
+    while not _process_gone(child_pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert _process_gone(child_pid)
+
+JQ_GOAL = "I need jq to do JSON filtering"
+
+@pytest.fixture
+def install_memo(monkeypatch, tmp_path):
+    """Point the install memo at an empty file under tmp_path."""
+    memo_file = tmp_path / "install_memo.json"
+    monkeypatch.setattr(provisioner, "INSTALL_MEMO_FILE", memo_file)
+    monkeypatch.setattr(provisioner, "_install_memo", {})
+    return memo_file
+
+def _shell_state(*command_observations):
+    state = ReActState(goal=JQ_GOAL)
+    for turn, (command, observation) in enumerate(command_observations, 1):
+        state.scratchpad.append(ScratchpadEntry(
+            turn=turn,
+            thought="",
+            action={"tool_name": "execute_shell", "parameters": {"command": command}},
+            observation=observation
+        ))
+    return state
+
+def test_remember_install_keeps_matching_install_command(offline_agent, install_memo):
+    state = _shell_state(
+        ("brew install jq", "SUCCESS: installed"),
+        ("brew update", "SUCCESS: updated"),
+        ("which jq", "SUCCESS: /usr/local/bin/jq")
+    )
+    offline_agent._remember_install(JQ_GOAL, state, {"tool_name": "jq", "verification_command": "jq --version"})
+
+    entry = json.loads(install_memo.read_text())[f"jq|{provisioner.HOST_PLATFORM}"]
+    assert entry["command"] == "brew install jq"
+    assert entry["verification"] == "jq"
+    assert time.time() - entry["remembered_at"] < 60
+
+def test_remember_install_ignores_unrelated_commands(offline_agent, install_memo):
+    state = _shell_state(("brew install wget", "SUCCESS: installed"), ("brew update", "SUCCESS: updated"))
+    offline_agent._remember_install(JQ_GOAL, state, {"tool_name": "jq", "verification_command": "jq --version"})
+
+    assert not install_memo.exists()
+    assert provisioner._get_install_memo() == {}
+
+def _memo_entry(remembered_at):
+    return {"command": "brew install jq", "verification": "jq", "tool_name": "jq",
+            "method": "brew", "remembered_at": remembered_at}
+
+def test_install_memo_expires(offline_agent, install_memo, monkeypatch):
+    memo_key = f"jq|{provisioner.HOST_PLATFORM}"
+    provisioner._install_memo[memo_key] = _memo_entry(time.time() - provisioner.INSTALL_MEMO_TTL_SECONDS - 1)
+    monkeypatch.setattr(offline_agent, "_which", lambda name: "/usr/local/bin/jq")
+
+    assert offline_agent._try_install_memo(JQ_GOAL, show_live_updates=False) is None
+    assert memo_key not in provisioner._get_install_memo()
+
+def test_install_memo_hit(offline_agent, install_memo, monkeypatch):
+    provisioner._install_memo[f"jq|{provisioner.HOST_PLATFORM}"] = _memo_entry(time.time())
+    monkeypatch.setattr(offline_agent, "_which", lambda name: "/usr/local/bin/jq")
+
+    result = offline_agent._try_install_memo(JQ_GOAL, show_live_updates=False)
+    assert result["success"] and result["tool_path"] == "/usr/local/bin/jq"
+    assert result["turns_taken"] == 0
+
+def test_install_memo_dropped_when_replay_fails_verification(offline_agent, install_memo, monkeypatch):
+    memo_key = f"jq|{provisioner.HOST_PLATFORM}"
+    provisioner._install_memo[memo_key] = _memo_entry(time.time())
+    offline_agent.auto_mode = True
+    replayed = []
+    monkeypatch.setattr(offline_agent, "_which", lambda name: None)
+    monkeypatch.setattr(offline_agent, "_execute_shell_action",
+                        lambda params: replayed.append(params["command"]) or "SUCCESS: Command completed")
+
+    assert offline_agent._try_install_memo(JQ_GOAL, show_live_updates=False) is None
+    assert replayed == ["brew install jq"]
+    assert memo_key not in json.loads(install_memo.read_text())
+
+def _long_shell_state(turns):
+    return _shell_state(*((f"echo step-{turn}", "SUCCESS: " + f"output-{turn} " * 60) for turn in range(1, turns + 1)))
+
+def test_prompt_history_summarizes_older_turns_past_budget(offline_agent):
+    state = _long_shell_state(20)
+    prompt = offline_agent._build_provisioner_prompt(state, JQ_GOAL)
+
+    assert offline_agent._history_chars > provisioner.HISTORY_CHAR_BUDGET
+    assert "Earlier turns (summarized):\n- Turn 1: execute_shell echo step-1 -> SUCCESS\n" in prompt
+    for entry in state.scratchpad[:-provisioner.HISTORY_RECENT_TURNS]:
+        assert offline_agent._format_history_entry(entry) not in prompt
+    # The most recent turns stay verbatim, in order, after the summary
+    recent = "".join(offline_agent._format_history_entry(e) for e in state.scratchpad[-provisioner.HISTORY_RECENT_TURNS:])
+    assert recent[:-1] in prompt
+    assert prompt.index("- Turn 17: execute_shell") < prompt.index("Turn 18:\nThought:")
+    assert "- Turn 18:" not in prompt
+
+def test_prompt_history_kept_verbatim_under_budget(offline_agent):
+    state = _shell_state(("brew install jq", "SUCCESS: installed"))
+    prompt = offline_agent._build_provisioner_prompt(state, JQ_GOAL)
+
+    assert "summarized" not in prompt
+    assert offline_agent._format_history_entry(state.scratchpad[0])[:-1] in prompt
+
+def test_prompt_cache_invalidated_when_scratchpad_changes(offline_agent):
+    state = _shell_state(("brew install jq", "FAILED: no brew"))
+    first = offline_agent._build_provisioner_prompt(state, JQ_GOAL)
+    assert offline_agent._build_provisioner_prompt(state, JQ_GOAL) is first
+
+    state.scratchpad.append(ScratchpadEntry(
+        turn=2, thought="", observation="SUCCESS: installed",
+        action={"tool_name": "execute_shell", "parameters": {"command": "apt-get install -y jq"}}
+    ))
+    second = offline_agent._build_provisioner_prompt(state, JQ_GOAL)
+    assert second is not first
+    assert "apt-get install -y jq" in second and "apt-get install -y jq" not in first
+
+    # A new run's state must not reuse the previous run's history
+    other = _shell_state(("pipx install jq", "FAILED: nope"))
+    third = offline_agent._build_provisioner_prompt(other, JQ_GOAL)
+    assert "pipx install jq" in third and "brew install jq" not in third
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a POSIX executable script")
+def test_path_index_refreshed_after_successful_shell_command(offline_agent, monkeypatch, tmp_path):
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(ToolProvisioningAgent, "_path_index", None)
+    monkeypatch.setattr(ToolProvisioningAgent, "_commands_not_found", set())
+
+    assert offline_agent._which("oats-fresh-tool") is None
+
+    # Simulates an installer dropping a binary into a directory already on PATH
+    tool = tmp_path / "oats-fresh-tool"
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    assert offline_agent._which("oats-fresh-tool") is None  # Misses are cached until something changes
+
+    assert offline_agent._execute_shell_action({"command": "false"}).startswith("FAILED")
+    assert offline_agent._which("oats-fresh-tool") is None
+
+    assert offline_agent._execute_shell_action({"command": "true"}).startswith("SUCCESS")
+    assert offline_agent._which("oats-fresh-tool") == str(tool)
+
 if __name__ == "__main__":
     test_scrubcsv_installation()
\ No newline at end of file
@@ -246,44 +246,45 @@ class UFGenerator:
     def load_uf(self, uf_id: str) -> Optional[Dict[str, Any]]:
         """Load a specific generated UF."""
         script_file = os.path.join(self.gen_dir, f"{uf_id}.sh")
-        if os.path.exists(script_file):
-            try:
-                # Read metadata from script comments
-                with open(script_file, 'r') as f:
-                    lines = f.readlines()
-                
-                metadata = {}
-                for line in lines:
-                    if line.startswith('# UF: '):
-                        # Use the filename-based UF ID instead of the one in the script
-                        metadata['uf_id'] = os.path.basename(script_file).replace('.sh', '')
-                    elif line.startswith('# Description: '):
-                        metadata['task_description'] = line[15:].strip()
-                    elif line.startswith('# Created: '):
-                        metadata['created_at'] = line[11:].strip()
-                    elif line.startswith('# Input Schema: '):
-                        try:
-                            metadata['input_schema'] = json.loads(line[16:].strip())
-                        except:
-                            metadata['input_schema'] = line[16:].strip()
-                    elif line.startswith('# Output Schema: '):
-                        try:
-                            metadata['output_schema'] = json.loads(line[17:].strip())
-                        except:
-                            metadata['output_schema'] = line[17:].strip()
-                    elif line.startswith('# Validation: '):
-                        metadata['validation'] = line[14:].strip()
-                    elif line.startswith('# Constraints: '):
-                        try:
-                            metadata['constraints'] = json.loads(line[15:].strip())
-                        except:
-                            metadata['constraints'] = line[15:].strip()
-                
-                metadata['script_file'] = script_file
-                metadata['test_file'] = os.path.join(self.tests_dir, f"{metadata['uf_id']}_test.sh")
-                return metadata
-            except Exception as e:
-                print(f"Error loading UF {uf_id}: {e}")
+        try:
+            # Read metadata from script comments
+            with open(script_file, 'r') as f:
+                lines = f.readlines()
+            
+            metadata = {}
+            for line in lines:
+                if line.startswith('# UF: '):
+                    # Use the filename-based UF ID instead of the one in the script
+                    metadata['uf_id'] = os.path.basename(script_file).replace('.sh', '')
+                elif line.startswith('# Description: '):
+                    metadata['task_description'] = line[15:].strip()
+                elif line.startswith('# Created: '):
+                    metadata['created_at'] = line[11:].strip()
+                elif line.startswith('# Input Schema: '):
+                    try:
+                        metadata['input_schema'] = json.loads(line[16:].strip())
+                    except:
+                        metadata['input_schema'] = line[16:].strip()
+                elif line.startswith('# Output Schema: '):
+                    try:
+                        metadata['output_schema'] = json.loads(line[17:].strip())
+                    except:
+                        metadata['output_schema'] = line[17:].strip()
+                elif line.startswith('# Validation: '):
+                    metadata['validation'] = line[14:].strip()
+                elif line.startswith('# Constraints: '):
+                    try:
+                        metadata['constraints'] = json.loads(line[15:].strip())
+                    except:
+                        metadata['constraints'] = line[15:].strip()
+            
+            metadata['script_file'] = script_file
+            metadata['test_file'] = os.path.join(self.tests_dir, f"{metadata['uf_id']}_test.sh")
+            return metadata
+        except FileNotFoundError:
+            pass  # No such UF; opening directly avoids a separate exists() check
+        except Exception as e:
+            print(f"Error loading UF {uf_id}: {e}")
         return None
     
     def delete_uf(self, uf_id: str) -> bool:
@@ -294,8 +295,10 @@ class UFGenerator:
             
             # Delete script and test files
             for file_path in [script_file, test_file]:
-                if os.path.exists(file_path):
+                try:
                     os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
             
             return True
         except Exception as e: